@@ -0,0 +1,66 @@
+# ANIMATION
+# One clock for every animation in the game. A clip says how many frames it has, how long each one shows
+# and what happens at the end, and anything playing a clip just remembers when it started, so the frame
+# to show is worked out from the shared time (for a whole array of drones at once if need be)
+from enum import Enum
+import math
+
+import numpy as np
+
+# Guards against 0.1 / 0.1 coming out as 0.9999999 after adding up lots of small steps
+_EPSILON = 1e-9
+
+
+#What a clip does once it runs out of frames
+class ClipMode(Enum):
+    LOOP = 0  # start again from frame 0
+    ONCE = 1  # finished, whoever is playing it goes back to whatever they were doing
+    HOLD = 2  # freeze on the last frame
+
+
+#One animation
+class Clip:
+    """A named run of frames, frame_time seconds each"""
+
+    def __init__(self, name, num_frames, frame_time, mode=ClipMode.LOOP):
+        self.name = name
+        self.num_frames = num_frames
+        self.frame_time = frame_time
+        self.mode = mode
+
+    def frame_at(self, elapsed):
+        """Frame showing elapsed seconds into the clip, None once a ONCE clip has finished"""
+        frame = math.floor(elapsed / self.frame_time + _EPSILON)
+        if self.mode == ClipMode.LOOP:
+            return frame % self.num_frames
+        if frame < self.num_frames:
+            return frame
+        return None if self.mode == ClipMode.ONCE else self.num_frames - 1
+
+    def frames_at(self, elapsed):
+        """frame_at for a whole array of elapsed times (LOOP and HOLD clips only)"""
+        frames = np.floor(elapsed / self.frame_time + _EPSILON).astype(np.int32)
+        if self.mode == ClipMode.LOOP:
+            return frames % self.num_frames
+        return np.minimum(frames, self.num_frames - 1)
+
+
+#The shared clock plus every clip the game knows about
+class Animator:
+    """Owns the clips and the animation time, tick() it once per simulation step"""
+
+    def __init__(self, clips=()):
+        self.clips = {clip.name: clip for clip in clips}
+        self.time = 0.0
+
+    def tick(self, delta_time):
+        """Move the clock forward, every playing clip advances with it"""
+        self.time += delta_time
+
+    def clip(self, name):
+        """The clip with this name"""
+        return self.clips[name]
+
+    def frame(self, name, start):
+        """Frame of the named clip for something that started playing it at time start"""
+        return self.clips[name].frame_at(self.time - start)
@@ -0,0 +1,402 @@
+# ASSET REGISTRY
+# Every texture in the game goes through here so each png is only loaded once
+# Gameplay sprites are named frames ("CA_0", "Enemy_Drone_3_frame_1", "Bullet"...) already scaled to the
+# size they're drawn at. They come out of one packed atlas image when `python assets.py` has built it,
+# otherwise each one is loaded and scaled from its own png
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+
+import arcade
+from PIL import Image
+
+from simulation import (
+    DRONE_FRAMES,
+    DRONE_TYPES,
+    PLAYER_ATTACK_FRAMES,
+    PLAYER_JUMP_FRAMES,
+    PLAYER_MAX_HEALTH,
+    PLAYER_SCALE,
+    ENEMY_SCALE,
+)
+
+# Where the build command keeps its content-hash manifest and the packed atlas
+CACHE_DIR = ".asset_cache"
+DRONE_MANIFEST = os.path.join(CACHE_DIR, "drone_frames.json")
+ATLAS_IMAGE = os.path.join(CACHE_DIR, "atlas.png")
+ATLAS_MAP = os.path.join(CACHE_DIR, "atlas.json")
+RAW_DIR = os.path.join(CACHE_DIR, "raw")
+
+# Decoded image cache files: this header (magic, width, height) then the RGBA pixels row by row
+RAW_HEADER = struct.Struct("<4sII")
+RAW_MAGIC = b"RGB1"
+
+# Big pngs worth keeping decoded on disk, `python assets.py` warms the cache with these
+RAW_CACHED_IMAGES = ["Background.png", "START_LOGO.png", "END_SCREEN.png"]
+
+# Atlas layout: how wide the packed image is and the gap left around each frame so
+# neighbours don't bleed into each other when the GPU filters them
+ATLAS_WIDTH = 512
+ATLAS_PADDING = 2
+
+HEART_BAR_SCALE = 0.6
+
+# Collisions are done by the simulation, so sprites only need the plain bounding box as a hit box
+# (arcade's default traces the outline pixel by pixel, which was most of the texture load time)
+HIT_BOX_ALGORITHM = arcade.hitbox.algo_bounding_box
+
+
+def _gameplay_frames():
+    """name -> (source png, scale, index of the square frame to cut from a sheet or None)"""
+    frames = {}
+    for i in range(PLAYER_ATTACK_FRAMES):
+        frames[f"CA_{i}"] = (f"CA_{i}.png", PLAYER_SCALE, None)
+    for i in range(PLAYER_JUMP_FRAMES):
+        frames[f"CJ_{i}"] = (f"CJ_{i}.png", PLAYER_SCALE, None)
+    frames["Friendly_Drone"] = ("Friendly_Drone.png", PLAYER_SCALE, None)
+    frames["Bullet"] = ("Bullet.png", 1.0, None)
+    for health in range(1, PLAYER_MAX_HEALTH + 1):
+        frames[f"HEART_BAR_{health}"] = (f"HEART_BAR_{health}.png", HEART_BAR_SCALE, None)
+    for drone_number in range(1, DRONE_TYPES + 1):
+        for i in range(DRONE_FRAMES):
+            frames[f"Enemy_Drone_{drone_number}_frame_{i}"] = (f"Enemy_Drone_{drone_number}.png", ENEMY_SCALE, i)
+    return frames
+
+
+# Every gameplay sprite the game draws, the start/end screens and background stay separate pngs
+GAMEPLAY_FRAMES = _gameplay_frames()
+
+
+def file_digest(path):
+    """Return the sha1 of a file's bytes, used to tell if a source image changed"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def raw_cache_path(digest):
+    """Where the decoded pixels of a png with this sha1 live"""
+    return os.path.join(RAW_DIR, f"{digest}.rgba")
+
+
+def write_raw(path, image):
+    """Save an RGBA image in the raw cache format, via a temp file so a half-written cache never gets read"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(RAW_HEADER.pack(RAW_MAGIC, image.width, image.height))
+        f.write(image.tobytes())
+    os.replace(temp_path, path)
+
+
+def read_raw(path):
+    """
+    Map a raw cache file into memory and wrap it as a read-only RGBA image without copying the pixels,
+    None if it's missing or doesn't look right
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < RAW_HEADER.size:
+        mapped.close()
+        return None
+    magic, width, height = RAW_HEADER.unpack_from(mapped)
+    if magic != RAW_MAGIC or len(mapped) != RAW_HEADER.size + width * height * 4:
+        mapped.close()
+        return None
+    # The image keeps the mapping alive for as long as it's around
+    return Image.frombuffer("RGBA", (width, height), memoryview(mapped)[RAW_HEADER.size:], "raw", "RGBA", 0, 1)
+
+
+def decode_image(path):
+    """
+    Load a png as RGBA through the decoded image cache: pages the pixels straight in when the cache has this
+    exact file (by content hash), otherwise decodes the png and fills the cache for next time
+    """
+    cache_path = raw_cache_path(file_digest(path))
+    image = read_raw(cache_path)
+    if image is None:
+        with Image.open(path) as source:
+            image = source.convert("RGBA")
+        write_raw(cache_path, image)
+    return image
+
+
+def slice_sheet(path, num_frames):
+    """Cut a horizontal sprite sheet into num_frames square frames (frame width = sheet height)"""
+    with Image.open(path) as sheet:
+        size = sheet.height
+        return [sheet.crop((i * size, 0, i * size + size, size)) for i in range(num_frames)]
+
+
+def frame_image(name):
+    """Load a gameplay frame from its source png as RGBA, scaled to the size it's drawn at"""
+    path, scale, index = GAMEPLAY_FRAMES[name]
+    if path in RAW_CACHED_IMAGES:
+        image = decode_image(path)
+    else:
+        with Image.open(path) as image:
+            image = image.convert("RGBA")
+    if index is not None:
+        size = image.height
+        image = image.crop((index * size, 0, index * size + size, size))
+    if scale != 1.0:
+        size = (round(image.width * scale), round(image.height * scale))
+        # Smooth when shrinking, plain bilinear (what the GPU did before) when growing
+        resample = Image.Resampling.LANCZOS if scale < 1 else Image.Resampling.BILINEAR
+        image = image.resize(size, resample)
+    return image
+
+
+def source_digests():
+    """sha1 of every png the gameplay frames come from"""
+    paths = sorted({path for path, _, _ in GAMEPLAY_FRAMES.values()})
+    return {path: file_digest(path) for path in paths}
+
+
+def read_atlas_map():
+    """The atlas frame map, or None when there's no atlas or the pngs changed since it was built"""
+    if not (os.path.exists(ATLAS_MAP) and os.path.exists(ATLAS_IMAGE)):
+        return None
+    with open(ATLAS_MAP) as f:
+        atlas_map = json.load(f)
+    if atlas_map.get("sources") != source_digests() or set(atlas_map.get("frames", ())) != set(GAMEPLAY_FRAMES):
+        return None
+    return atlas_map
+
+
+#Shared texture/sprite cache
+class AssetRegistry:
+    """Process-wide cache of textures and sprites keyed by file path (or frame name for gameplay frames)"""
+
+    def __init__(self):
+        """
+        Start with an empty cache and zeroed hit/miss counters
+        """
+        self.textures = {}
+        self.frames = {}
+        self.sprites = {}
+        self.frame_sets = {}
+        self.atlas_loaded = False
+        self.hits = 0
+        self.misses = 0
+        # The StartupPipeline loads frames from worker threads, += on the counters isn't atomic
+        self.counter_lock = threading.Lock()
+
+    def texture(self, path):
+        """Return the shared texture for path, loading it the first time it is asked for"""
+        texture = self.textures.get(path)
+        if texture is None:
+            self._count(hit=False)
+            # Naming it by path saves arcade hashing every pixel to come up with a name
+            texture = arcade.Texture(decode_image(path), hit_box_algorithm=HIT_BOX_ALGORITHM, hash=path)
+            self.textures[path] = texture
+        else:
+            self._count(hit=True)
+        return texture
+
+    def frame(self, name):
+        """Return the shared texture for a gameplay frame, already the size it's drawn at (use scale 1)"""
+        texture = self.frames.get(name)
+        if texture is None:
+            self._count(hit=False)
+            texture = self._frame_texture(name, frame_image(name))
+            self.frames[name] = texture
+        else:
+            self._count(hit=True)
+        return texture
+
+    def _count(self, hit):
+        with self.counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _frame_texture(self, name, image):
+        return arcade.Texture(image, hit_box_algorithm=HIT_BOX_ALGORITHM, hash=f"frame|{name}")
+
+    def load_atlas(self):
+        """Decode the packed atlas once and cut every gameplay frame out of it, False if it's missing or stale"""
+        atlas_map = read_atlas_map()
+        if atlas_map is None:
+            return False
+        atlas = decode_image(ATLAS_IMAGE)
+        for name, (x, y, width, height) in atlas_map["frames"].items():
+            if name not in self.frames:
+                self.frames[name] = self._frame_texture(name, atlas.crop((x, y, x + width, y + height)))
+        self.atlas_loaded = True
+        return True
+
+    def sprite(self, path, scale=1.0):
+        """Return the shared sprite for (path, scale), used for static screen art like logos"""
+        key = (path, scale)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = arcade.Sprite(self.texture(path), scale=scale)
+            self.sprites[key] = sprite
+        else:
+            self._count(hit=True)
+        return sprite
+
+    def frame_set(self, prefix, num_frames):
+        """Return the shared list of frames {prefix}_0, {prefix}_1..."""
+        key = (prefix, num_frames)
+        frames = self.frame_sets.get(key)
+        if frames is None:
+            frames = [self.frame(f"{prefix}_{i}") for i in range(num_frames)]
+            self.frame_sets[key] = frames
+        else:
+            self._count(hit=True)
+        return frames
+
+    def drone_frames(self, drone_number):
+        """Return the shared animation frames for a drone type"""
+        return self.frame_set(f"Enemy_Drone_{drone_number}_frame", DRONE_FRAMES)
+
+    def preload_drones(self):
+        """Load every drone type up front so spawning never touches the disk"""
+        for drone_number in range(1, DRONE_TYPES + 1):
+            self.drone_frames(drone_number)
+
+    def gameplay_jobs(self):
+        """
+        Loading jobs for every gameplay frame, for running on background threads: one job for the whole
+        atlas when it's been built, or one per frame from the pngs when it hasn't. Each job loads different
+        frames, so at worst two threads asking for the same one decode it twice
+        """
+        if read_atlas_map() is not None:
+            return [self.load_atlas]
+        return [lambda name=name: self.frame(name) for name in GAMEPLAY_FRAMES]
+
+    def evict(self, path=None):
+        """Drop path (or everything when path is None) and any sprites built from it"""
+        if path is None:
+            self.textures.clear()
+            self.frames.clear()
+            self.sprites.clear()
+            self.frame_sets.clear()
+            self.atlas_loaded = False
+            return
+        self.textures.pop(path, None)
+        for key in [key for key in self.sprites if key[0] == path]:
+            del self.sprites[key]
+
+    def stats(self):
+        """Return the cache counters as a dict"""
+        return {
+            "textures": len(self.textures),
+            "frames": len(self.frames),
+            "atlas_loaded": self.atlas_loaded,
+            "sprites": len(self.sprites),
+            "frame_sets": len(self.frame_sets),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+#the one registry the whole game shares
+ASSETS = AssetRegistry()
+
+
+#Build step: write Enemy_Drone_{n}_frame_{i}.png, skipping sheets whose content hash hasn't changed
+def build_drone_frames(force=False):
+    """Re-cut the drone sheets on disk and return the list of sheets that were rebuilt"""
+    manifest = {}
+    if os.path.exists(DRONE_MANIFEST) and not force:
+        with open(DRONE_MANIFEST) as f:
+            manifest = json.load(f)
+
+    rebuilt = []
+    for drone_number in range(1, DRONE_TYPES + 1):
+        path = f"Enemy_Drone_{drone_number}.png"
+        digest = file_digest(path)
+        frame_paths = [f"Enemy_Drone_{drone_number}_frame_{i}.png" for i in range(DRONE_FRAMES)]
+        if manifest.get(path) == digest and all(os.path.exists(frame) for frame in frame_paths):
+            continue
+        for frame, frame_path in zip(slice_sheet(path, DRONE_FRAMES), frame_paths):
+            frame.save(frame_path)
+        manifest[path] = digest
+        rebuilt.append(path)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(DRONE_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return rebuilt
+
+
+def pack_shelves(sizes, width=ATLAS_WIDTH, padding=ATLAS_PADDING):
+    """
+    Lay out {name: (width, height)} in rows (tallest first) across an image width pixels wide.
+    Returns ({name: (x, y)}, total height)
+    """
+    positions = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if w + 2 * padding > width:
+            raise ValueError(f"{name} is {w} px wide, too wide for a {width} px atlas")
+        if x + w + 2 * padding > width:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[name] = (x + padding, y + padding)
+        x += w + 2 * padding
+        shelf_height = max(shelf_height, h + 2 * padding)
+    return positions, y + shelf_height
+
+
+#Build step: pack every gameplay frame, pre-scaled, into one image plus a JSON map of where each one is
+def build_atlas(force=False):
+    """Write the atlas image and frame map, returns False when the existing one is already up to date"""
+    if not force and read_atlas_map() is not None:
+        return False
+    images = {name: frame_image(name) for name in GAMEPLAY_FRAMES}
+    positions, height = pack_shelves({name: image.size for name, image in images.items()})
+
+    atlas = Image.new("RGBA", (ATLAS_WIDTH, height), (0, 0, 0, 0))
+    frames = {}
+    for name, image in images.items():
+        x, y = positions[name]
+        atlas.paste(image, (x, y))
+        frames[name] = [x, y, image.width, image.height]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    atlas.save(ATLAS_IMAGE)
+    with open(ATLAS_MAP, "w") as f:
+        json.dump({"sources": source_digests(), "frames": frames}, f, indent=2)
+    return True
+
+
+#Build step: decode the big pngs into the raw cache ahead of time and clear out stale entries
+def build_raw_cache():
+    """Make sure every RAW_CACHED_IMAGES png (and the atlas) is cached, returns (cached, pruned) counts"""
+    paths = list(RAW_CACHED_IMAGES)
+    if os.path.exists(ATLAS_IMAGE):
+        paths.append(ATLAS_IMAGE)
+    for path in paths:
+        decode_image(path)
+    wanted = {os.path.basename(raw_cache_path(file_digest(path))) for path in paths}
+    pruned = 0
+    for name in os.listdir(RAW_DIR):
+        if name not in wanted:
+            os.remove(os.path.join(RAW_DIR, name))
+            pruned += 1
+    return len(paths), pruned
+
+
+#python assets.py [--force] re-cuts any drone sheet that changed, rebuilds the atlas if it's out of date
+#and fills the decoded image cache
+if __name__ == "__main__":
+    force = "--force" in sys.argv
+    rebuilt = build_drone_frames(force)
+    print(f"rebuilt {len(rebuilt)} drone sheet(s): {', '.join(rebuilt) or 'none'}")
+    if build_atlas(force):
+        print(f"packed {len(GAMEPLAY_FRAMES)} frames into {ATLAS_IMAGE}")
+    else:
+        print(f"{ATLAS_IMAGE} is up to date")
+    cached, pruned = build_raw_cache()
+    print(f"{cached} decoded image(s) in {RAW_DIR}, pruned {pruned} stale")
@@ -0,0 +1,115 @@
+# SCROLLING BACKGROUND
+# The background is one full-screen quad. Each layer is a wrapping (repeating) texture and scrolling just
+# moves a texture offset, so there's no sprites to move or leapfrog and no per-layer Python work besides
+# adding to a number. Layers further back scroll slower for parallax, all of them are blended in the one draw
+# The shader does the blending itself on top of a solid base colour, so the quad goes out opaque with GL
+# blending off, which is cheaper per pixel than the two alpha blended sprites this replaced
+from arcade.gl import geometry
+
+from assets import decode_image
+from simulation import BASE_FRAME_RATE
+
+# Back to front: (png, scroll speed in pixels per 1/60 s). More layers go on the end, pngs with see-through
+# parts let the ones behind show, anything above a layer's height is see-through too
+BACKGROUND_LAYERS = [
+    ("Background.png", 2),
+]
+
+VERTEX_SHADER = """
+#version 330
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 v_uv;
+
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+
+# The fragment shader gets one block like this per layer, see _fragment_shader()
+LAYER_SOURCE = """
+    uv = vec2((pixel.x + offset_{i}) / size_{i}.x, pixel.y / size_{i}.y);
+    if (uv.y <= 1.0) {{
+        texel = texture(layer_{i}, vec2(uv.x, 1.0 - uv.y));
+        color = mix(color, texel.rgb, texel.a);
+    }}
+"""
+
+
+def _fragment_shader(layers):
+    """Fragment shader source that blends layers textures back to front"""
+    uniforms = "".join(
+        f"uniform sampler2D layer_{i};\nuniform float offset_{i};\nuniform vec2 size_{i};\n"
+        for i in range(layers)
+    )
+    body = "".join(LAYER_SOURCE.format(i=i) for i in range(layers))
+    return f"""
+#version 330
+
+uniform vec2 screen_size;
+uniform vec3 base_color;
+{uniforms}
+in vec2 v_uv;
+
+out vec4 out_color;
+
+void main() {{
+    // Screen position in pixels from the bottom left, layers are drawn at their own pixel size
+    vec2 pixel = v_uv * screen_size;
+    vec2 uv;
+    vec4 texel;
+    vec3 color = base_color;
+{body}
+    out_color = vec4(color, 1.0);
+}}
+"""
+
+
+#Parallax background
+class ScrollingBackground:
+    """Every background layer drawn with one quad, update() scrolls them and draw() draws them"""
+
+    def __init__(self, ctx, screen_size, base_color, layers=BACKGROUND_LAYERS):
+        """
+        ctx is the window's arcade.gl Context, base_color the (r, g, b) showing where no layer covers,
+        layers a list of (png path, scroll speed) back to front
+        """
+        self.ctx = ctx
+        self.speeds = [speed for _, speed in layers]
+        self.widths = []
+        self.textures = []
+        for path, _ in layers:
+            image = decode_image(path)
+            texture = ctx.texture(image.size, components=4, data=image.tobytes(),
+                                  wrap_x=ctx.REPEAT, wrap_y=ctx.CLAMP_TO_EDGE)
+            self.textures.append(texture)
+            self.widths.append(image.width)
+        self.offsets = [0.0] * len(layers)
+
+        self.quad = geometry.quad_2d_fs()
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=_fragment_shader(len(layers)))
+        self.program["screen_size"] = screen_size
+        self.program["base_color"] = tuple(channel / 255 for channel in base_color[:3])
+        for i, texture in enumerate(self.textures):
+            self.program[f"layer_{i}"] = i
+            self.program[f"size_{i}"] = texture.size
+
+    def update(self, delta_time):
+        """Scroll every layer to the left at its own speed"""
+        frames = delta_time * BASE_FRAME_RATE
+        self.offsets = [
+            (offset + speed * frames) % width
+            for offset, speed, width in zip(self.offsets, self.speeds, self.widths)
+        ]
+
+    def draw(self):
+        """Draw all the layers over the whole screen, call it first thing so everything else goes on top"""
+        program = self.program
+        for i, (texture, offset) in enumerate(zip(self.textures, self.offsets)):
+            texture.use(i)
+            program[f"offset_{i}"] = offset
+        with self.ctx.enabled_only():
+            self.quad.render(program)
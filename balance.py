@@ -0,0 +1,269 @@
+# BALANCING SWEEPS
+# Plays lots of seeded headless games for every combination in a grid of tuning values, spread over every
+# core with a process pool, and sums them up into one report (survival time, score, kills per second and
+# what a frame costs) so tuning doesn't mean playing the game by hand for a day
+#   python balance.py --param bullet_cooldown_time=0.3,0.4,0.5 --games 500
+#   python balance.py --grid grid.json --policy tracker --output sweep.json
+# grid.json is {"name": [values...], ...}. Every combination plays the same seeds, so the differences
+# between them come from the values and not from luck
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmark import FRAME_TIME, Bot, git_commit
+from metrics import percentile
+from simulation import POINTS_PER_KILL, Action, GameSimulation, GameState
+from waves import WAVES_PATH, Wave, WavePlan
+
+# Tunables that are GameSimulation attributes, set straight on each game
+SIM_PARAMS = ("bullet_cooldown_time", "power_cooldown_time", "powerup_destruction_time")
+# Multipliers applied to the wave file: spawn spacing (wave delays and intervals) and drone speed
+WAVE_PARAMS = ("spawn_interval_scale", "enemy_speed_scale")
+
+# Longest a game is played for, games still going by then count as survived
+MAX_GAME_SECONDS = 300
+GAMES_PER_COMBINATION = 100
+
+START_INPUTS = [(Action.SHOOT, True), (Action.SHOOT, False)]
+
+
+#Bot policies, each one is asked for a frame's inputs with the game in front of it
+class MasherPolicy:
+    """The benchmark bot: fires every frame, sweeps up and down and uses the powerup every 10 s"""
+
+    def __init__(self):
+        self.bot = Bot(power_every=600)
+
+    def inputs(self, sim, frame):
+        return self.bot.inputs(frame)
+
+
+class IdlePolicy:
+    """Never touches the controls, how long the drones take to get through on their own"""
+
+    def inputs(self, sim, frame):
+        return []
+
+
+class TrackerPolicy:
+    """Lines up with whichever drone is closest to the right edge and fires, powers up when it gets crowded"""
+
+    # Pixels off the target's lane that count as lined up, and how many drones make it use the powerup
+    DEADBAND = 8
+    CROWD = 12
+
+    def __init__(self):
+        self.direction = None
+
+    def inputs(self, sim, frame):
+        events = [(Action.SHOOT, True), (Action.SHOOT, False)]
+        enemies = sim.enemies
+        n = len(enemies)
+        wanted = None
+        if n:
+            target_y = enemies.y[:n][enemies.x[:n].argmax()]
+            offset = target_y - sim.player.center_y
+            if offset > self.DEADBAND:
+                wanted = Action.UP
+            elif offset < -self.DEADBAND:
+                wanted = Action.DOWN
+        if wanted != self.direction:
+            if self.direction is not None:
+                events.append((self.direction, False))
+            if wanted is not None:
+                events.append((wanted, True))
+            self.direction = wanted
+        if n >= self.CROWD:
+            events.append((Action.POWER, True))
+            events.append((Action.POWER, False))
+        return events
+
+
+POLICIES = {
+    "masher": MasherPolicy,
+    "idle": IdlePolicy,
+    "tracker": TrackerPolicy,
+}
+
+
+def tuned_plan(plan, params):
+    """The wave plan with the grid's spawn spacing and drone speed multipliers applied"""
+    interval = params.get("spawn_interval_scale", 1.0)
+    speed = params.get("enemy_speed_scale", 1.0)
+    if interval == 1.0 and speed == 1.0:
+        return plan
+    waves = [
+        Wave(wave.name, wave.count, wave.delay * interval, wave.interval * interval,
+             wave.lanes, wave.drone_types, wave.speed * speed)
+        for wave in plan.waves
+    ]
+    return WavePlan(waves, plan.loop, plan.spawn_budget)
+
+
+def play_game(job):
+    """Play one seeded game to game over (or max_seconds) and return its results, runs in a worker process"""
+    params, seed, policy_name, max_seconds, plan = job
+    sim = GameSimulation(seed, tuned_plan(plan, params))
+    for name in SIM_PARAMS:
+        if name in params:
+            setattr(sim, name, params[name])
+    policy = POLICIES[policy_name]()
+    sim.advance(FRAME_TIME, START_INPUTS)
+
+    max_frames = round(max_seconds / FRAME_TIME)
+    frame = 0
+    busy = 0.0
+    slowest = 0.0
+    clock = time.perf_counter
+    while sim.current_state == GameState.PLAYING and frame < max_frames:
+        inputs = policy.inputs(sim, frame)
+        start = clock()
+        sim.advance(FRAME_TIME, inputs)
+        elapsed = clock() - start
+        busy += elapsed
+        slowest = max(slowest, elapsed)
+        frame += 1
+
+    survival = frame * FRAME_TIME
+    kills = sim.score // POINTS_PER_KILL
+    return {
+        "seed": seed,
+        "survival_time": survival,
+        "survived": sim.current_state == GameState.PLAYING,
+        "score": sim.score,
+        "kills_per_second": kills / survival if survival else 0.0,
+        "frames": frame,
+        "busy": busy,
+        "slowest": slowest,
+    }
+
+
+def summarize(params, games):
+    """Sum up one combination's games"""
+    survival = sorted(game["survival_time"] for game in games)
+    scores = [game["score"] for game in games]
+    frames = sum(game["frames"] for game in games)
+    busy = sum(game["busy"] for game in games)
+    return {
+        "params": params,
+        "games": len(games),
+        "survival_mean": statistics.fmean(survival),
+        "survival_median": statistics.median(survival),
+        "survival_p10": percentile(survival, 0.10),
+        "survived_fraction": sum(game["survived"] for game in games) / len(games),
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "kills_per_second": statistics.fmean(game["kills_per_second"] for game in games),
+        "frame_ms_mean": busy / frames * 1000 if frames else 0.0,
+        "frame_ms_max": max(game["slowest"] for game in games) * 1000,
+    }
+
+
+def combinations(grid):
+    """Every combination of the grid's values as a list of {name: value} dicts, in a stable order"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def sweep(grid, games=GAMES_PER_COMBINATION, policy="masher", seed=0, max_seconds=MAX_GAME_SECONDS,
+          workers=None, waves=WAVES_PATH):
+    """Play games seeded games per grid combination across workers processes and return the report"""
+    workers = workers or os.cpu_count() or 1
+    plan = WavePlan.load(waves)
+    combos = combinations(grid)
+    jobs = [(params, seed + i, policy, max_seconds, plan) for params in combos for i in range(games)]
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = list(map(play_game, jobs))
+    else:
+        # Chunks keep the pickling overhead down while still leaving enough pieces to balance the cores
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(play_game, jobs, chunksize=chunksize))
+    wall_time = time.perf_counter() - started
+
+    summaries = [summarize(params, results[i * games:(i + 1) * games]) for i, params in enumerate(combos)]
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "policy": policy,
+        "games_per_combination": games,
+        "seeds": [seed, seed + games - 1],
+        "max_seconds": max_seconds,
+        "workers": workers,
+        "wall_time": wall_time,
+        "game_seconds_per_second": sum(game["survival_time"] for game in results) / wall_time,
+        "grid": grid,
+        "results": summaries,
+    }
+
+
+def parse_param(text):
+    """NAME=V1,V2,... -> (name, [values])"""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... not {text!r}")
+    try:
+        return name.strip(), [float(value) for value in values.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name}: values must be numbers") from None
+
+
+def print_table(report, out):
+    """One line per combination, for reading in a terminal"""
+    print(f"{report['games_per_combination']} games per combination, policy {report['policy']}, "
+          f"{report['workers']} workers, {report['wall_time']:.1f} s", file=out)
+    for result in report["results"]:
+        params = " ".join(f"{name}={value:g}" for name, value in result["params"].items()) or "(defaults)"
+        print(f"{params:60} survive {result['survival_mean']:7.1f} s  score {result['score_mean']:8.1f}  "
+              f"kills/s {result['kills_per_second']:5.2f}  frame {result['frame_ms_mean']:.3f} ms", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel headless ROBOT UPRISING balancing sweeps")
+    parser.add_argument("--param", type=parse_param, action="append", default=[], metavar="NAME=V1,V2",
+                        help=f"values to try, NAME is one of {', '.join(SIM_PARAMS + WAVE_PARAMS)}")
+    parser.add_argument("--grid", help="JSON file of {name: [values]} (combined with any --param)")
+    parser.add_argument("--games", type=int, default=GAMES_PER_COMBINATION, help="games per combination")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="masher")
+    parser.add_argument("--seed", type=int, default=0, help="first seed, games use seed, seed+1, ...")
+    parser.add_argument("--max-seconds", type=float, default=MAX_GAME_SECONDS)
+    parser.add_argument("--workers", type=int, help="processes to use (default: every core)")
+    parser.add_argument("--waves", default=WAVES_PATH, help="wave file the spawn multipliers apply to")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    grid.update(dict(args.param))
+    unknown = [name for name in grid if name not in SIM_PARAMS + WAVE_PARAMS]
+    if unknown:
+        parser.error(f"unknown parameter(s): {', '.join(unknown)}")
+    if any(not scale > 0 for scale in grid.get("enemy_speed_scale", ())):
+        parser.error("enemy_speed_scale values must be above 0")
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    report = sweep(grid, args.games, args.policy, args.seed, args.max_seconds, args.workers, args.waves)
+    print_table(report, sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
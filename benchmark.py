@@ -0,0 +1,243 @@
+# BENCHMARKS
+# Headless scenarios that hammer the simulation with a scripted bot and report frame times as JSON,
+# so runs can be compared between commits (no window or display needed)
+#   python benchmark.py                      runs every scenario
+#   python benchmark.py enemies_500 soak     runs just those
+#   python benchmark.py --output bench.json  writes the report to a file
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from metrics import percentile
+from simulation import (
+    SCREEN_WIDTH,
+    PLAYER_MAX_HEALTH,
+    DRONE_TYPES,
+    ENEMY_LANES,
+    Action,
+    GameSimulation,
+)
+from waves import WAVES_PATH, WavePlan
+
+# One benchmark frame is one 60 fps display frame (two fixed simulation steps)
+FRAME_TIME = 1 / 60
+# Health the bot gets in scenarios that shouldn't end just because drones got through
+KEEP_ALIVE_HEALTH = 10 ** 6
+
+
+#Scripted bot
+class Bot:
+    """Plays like a button masher: fires every frame, sweeps up and down, and can use the powerup on a schedule"""
+
+    def __init__(self, shoot=True, sweep_frames=90, power_every=None):
+        """
+        sweep_frames is how long it holds up/down before switching (None to stand still),
+        power_every presses E every that many frames (None to never)
+        """
+        self.shoot = shoot
+        self.sweep_frames = sweep_frames
+        self.power_every = power_every
+        self.direction = None
+
+    def inputs(self, frame):
+        """The (Action, pressed) events for this frame"""
+        events = []
+        if self.shoot:
+            # Pressing every frame means a bullet goes out the moment the cooldown allows it
+            events.append((Action.SHOOT, True))
+            events.append((Action.SHOOT, False))
+        if self.sweep_frames and frame % self.sweep_frames == 0:
+            if self.direction is not None:
+                events.append((self.direction, False))
+            self.direction = Action.DOWN if self.direction == Action.UP else Action.UP
+            events.append((self.direction, True))
+        if self.power_every and frame % self.power_every == 0:
+            events.append((Action.POWER, True))
+            events.append((Action.POWER, False))
+        return events
+
+
+#Scenario description
+class Scenario:
+    """One named benchmark: how many frames, how many enemies to keep on screen and how the bot plays"""
+
+    def __init__(self, name, description, frames, enemies=None, keep_alive=True,
+                 power_cooldown=None, bot=None, waves=None):
+        """
+        enemies keeps exactly that many drones alive (topped up every frame, normal spawning off),
+        None leaves the game's own spawner running with waves (a wave file dict, None for waves.json)
+        """
+        self.name = name
+        self.description = description
+        self.frames = frames
+        self.enemies = enemies
+        self.keep_alive = keep_alive
+        self.power_cooldown = power_cooldown
+        self.bot = bot or (lambda: Bot())
+        self.waves = waves
+
+    def wave_plan(self):
+        """The WavePlan the simulation should run"""
+        if self.enemies is not None:
+            return WavePlan([])
+        if self.waves is not None:
+            return WavePlan.from_dict(self.waves)
+        return WavePlan.load(WAVES_PATH)
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario("idle", "game running with no enemies and nobody at the controls", 600,
+                 enemies=0, bot=lambda: Bot(shoot=False, sweep_frames=None)),
+        Scenario("enemies_50", "50 drones on screen, bot firing", 600, enemies=50),
+        Scenario("enemies_500", "500 drones on screen, bot firing", 600, enemies=500),
+        Scenario("enemies_5000", "5000 drones on screen, bot firing", 300, enemies=5000),
+        Scenario("bullet_spam", "bot firing at the bullet_cooldown_time limit into 50 drones", 1200,
+                 enemies=50, bot=lambda: Bot(sweep_frames=15)),
+        Scenario("powerup_wipe", "powerup mass destruction of 500 drones every 5 s", 900,
+                 enemies=500, power_cooldown=5.0, bot=lambda: Bot(power_every=60)),
+        Scenario("horde", "a 300 drone wave every 10 s, spread out by the spawn budget", 1800,
+                 waves={"loop": True, "waves": [{"name": "horde", "delay": 10.0, "count": 300}]}),
+        Scenario("soak", "10 minutes of normal spawning with the bot playing", 36000,
+                 bot=lambda: Bot(power_every=600)),
+    )
+}
+
+
+def fill_enemies(sim, count):
+    """Spawn drones until there are count of them, spread across the left part of the screen"""
+    rng = sim.rng
+    while len(sim.enemies) < count:
+        # Same draws in the same order as a plain spawn_enemy() followed by picking an x
+        y_position = rng.choice(ENEMY_LANES)
+        drone_number = rng.randint(1, DRONE_TYPES)
+        sim.spawn_enemy(y_position, drone_number, x_position=rng.uniform(-30, SCREEN_WIDTH - 300))
+
+
+def gc_collections():
+    """How many garbage collections have run so far, all generations"""
+    return sum(stat["collections"] for stat in gc.get_stats())
+
+
+def run_scenario(scenario, frames=None, seed=0):
+    """Play one scenario and return its results as a dict"""
+    frames = scenario.frames if frames is None else frames
+    sim = GameSimulation(seed, scenario.wave_plan())
+    bot = scenario.bot()
+
+    # Start the round
+    sim.advance(FRAME_TIME, [(Action.SHOOT, True), (Action.SHOOT, False)])
+    if scenario.power_cooldown is not None:
+        sim.power_cooldown_time = scenario.power_cooldown
+
+    frame_times = []
+    alloc_blocks = 0
+    enemy_total = 0
+    enemy_max = bullet_max = spawn_backlog_max = 0
+
+    gc.collect()
+    collections_before = gc_collections()
+    clock = time.perf_counter
+    for frame in range(frames):
+        if scenario.keep_alive:
+            sim.health = KEEP_ALIVE_HEALTH
+        inputs = bot.inputs(frame)
+
+        blocks_before = sys.getallocatedblocks()
+        start = clock()
+        # Topping the drones back up is part of the frame, it's the spawn hot path
+        if scenario.enemies:
+            fill_enemies(sim, scenario.enemies)
+        sim.advance(FRAME_TIME, inputs)
+        frame_times.append(clock() - start)
+        alloc_blocks += sys.getallocatedblocks() - blocks_before
+
+        enemy_total += len(sim.enemies)
+        enemy_max = max(enemy_max, len(sim.enemies))
+        bullet_max = max(bullet_max, len(sim.bullets))
+        spawn_backlog_max = max(spawn_backlog_max, sim.waves.backlog())
+    collections = gc_collections() - collections_before
+
+    if scenario.keep_alive:
+        sim.health = PLAYER_MAX_HEALTH
+    ordered = sorted(frame_times)
+    total = sum(frame_times)
+    return {
+        "description": scenario.description,
+        "frames": frames,
+        "seed": seed,
+        "mean_ms": total / frames * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "frames_per_second": frames / total if total else 0.0,
+        "net_alloc_blocks_per_frame": alloc_blocks / frames,
+        "gc_collections": collections,
+        "enemies_mean": enemy_total / frames,
+        "enemies_max": enemy_max,
+        "bullets_max": bullet_max,
+        "particles": sim.particles.stats(),
+        "timers": sim.timers.stats(),
+        "events": sim.events.stats(),
+        "spawn_backlog_max": spawn_backlog_max,
+        "score": sim.score,
+        "pools": sim.pool_stats(),
+    }
+
+
+def git_commit():
+    """Commit hash of the working tree, if this is a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, frames=None, seed=0):
+    """Run the named scenarios and return the full report"""
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "frame_time": FRAME_TIME,
+        "scenarios": {name: run_scenario(SCENARIOS[name], frames, seed) for name in names},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless ROBOT UPRISING benchmarks")
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run (default: all)")
+    parser.add_argument("--frames", type=int, help="override every scenario's frame count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:14} {scenario.frames:6} frames  {scenario.description}")
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    if args.frames is not None and args.frames < 1:
+        parser.error("--frames must be at least 1")
+
+    report = json.dumps(run(names, args.frames, args.seed), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# COLLISION CHECKS
+# Box vs box overlap for whole arrays of boxes at once (the enemy store)
+# The bounds are worked out once a step and every query (each bullet, the player) reuses them
+# Bucketing drones into lanes or a grid cost more to rebuild every frame than it saved. A sort and sweep
+# (sort by left edge, binary search each query's slice) only pays off with lots of queries: one scan of
+# 5000 boxes is ~15 us, mostly NumPy call overhead, but sorting them is ~450 us. So a step with a few
+# queries scans, and one with SWEEP_MIN_QUERIES or more sorts first
+import numpy as np
+
+# Queries in a step before sorting for them beats scanning every box each time
+SWEEP_MIN_QUERIES = 32
+
+
+def overlapping(bounds, left, bottom, right, top):
+    """
+    Indices of the boxes in bounds (arrays of lefts, bottoms, rights, tops) that touch or
+    overlap the given box, lowest index first
+    """
+    lefts, bottoms, rights, tops = bounds
+    return np.flatnonzero((lefts <= right) & (rights >= left) & (bottoms <= top) & (tops >= bottom))
+
+
+def collision_index(bounds, queries):
+    """ScanIndex or SweepIndex over bounds, whichever is cheaper for about this many queries"""
+    if queries >= SWEEP_MIN_QUERIES:
+        return SweepIndex(bounds)
+    return ScanIndex(bounds)
+
+
+#Brute force
+class ScanIndex:
+    """Tests every box on each query, the bounds are only computed once"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+
+    def query(self, left, bottom, right, top):
+        """Indices of the boxes touching or overlapping the given box, lowest first"""
+        if not len(self.bounds[0]):
+            return ()
+        return overlapping(self.bounds, left, bottom, right, top)
+
+
+#Sort and sweep broadphase
+class SweepIndex:
+    """Boxes sorted by left edge, built once and then queried for every bullet and the player"""
+
+    def __init__(self, bounds):
+        """bounds is (lefts, bottoms, rights, tops) arrays, the boxes mustn't move while the index is used"""
+        lefts, bottoms, rights, tops = bounds
+        self.order = np.argsort(lefts, kind="stable")
+        self.bounds = tuple(column[self.order] for column in bounds)
+        # A box can't reach further right than its left edge plus the widest box
+        self.max_width = float((rights - lefts).max()) if len(lefts) else 0.0
+
+    def query(self, left, bottom, right, top):
+        """Indices (into the original bounds) of the boxes touching or overlapping the given box, lowest first"""
+        lefts = self.bounds[0]
+        start = np.searchsorted(lefts, left - self.max_width, "left")
+        end = np.searchsorted(lefts, right, "right")
+        if start >= end:
+            return ()
+        window = tuple(column[start:end] for column in self.bounds)
+        hits = overlapping(window, left, bottom, right, top)
+        if not len(hits):
+            return ()
+        return np.sort(self.order[start + hits])
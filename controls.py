@@ -0,0 +1,20 @@
+# CONTROLS
+# Which controls are held down right now. Presses and releases only flip entries in this table and the
+# simulation reads movement off it at the start of every step, so holding up and down together stands
+# still and letting go of one goes back to the other, instead of whichever key event came last winning
+#Held controls
+class ControlState:
+    """The set of controls held down, press()/release() keep it up to date and axis() reads it"""
+
+    def __init__(self):
+        self.held = set()
+
+    def press(self, action):
+        self.held.add(action)
+
+    def release(self, action):
+        self.held.discard(action)
+
+    def axis(self, negative, positive):
+        """-1, 0 or 1 for a pair of opposite controls, both held (or neither) is 0"""
+        return (positive in self.held) - (negative in self.held)
@@ -0,0 +1,276 @@
+# ENEMY STORE
+# Every drone's state lives in NumPy arrays (one column per field, one row per drone) so a whole horde
+# moves, animates and gets hit tested with a handful of array operations instead of a Python loop
+# Rows are kept packed at the front: removing a drone moves the last row into its place
+import numpy as np
+
+from collision import collision_index
+from pools import ObjectPool
+
+# Rows to start with, the arrays double whenever they fill up
+ENEMY_STORE_CAPACITY = 256
+
+# remove_many() packs the arrays in one pass once the drones going are at least 1/this of them
+COMPACT_FRACTION = 8
+
+# name -> dtype of every per-drone array
+COLUMNS = {
+    "x": np.float64,
+    "y": np.float64,
+    "prev_x": np.float64,
+    "prev_y": np.float64,
+    "vx": np.float64,  # pixels per 1/60 s
+    "vy": np.float64,
+    "anim_start": np.float64,  # animation clock time the drone's loop started from
+    "frame": np.int32,
+    "frame_changed": np.bool_,  # frame moved on since the renderer last looked
+    "drone_type": np.int32,
+    "health": np.int32,
+    # hit box relative to the centre, copied in from the drone type when it spawns
+    "box_left": np.float64,
+    "box_bottom": np.float64,
+    "box_right": np.float64,
+    "box_top": np.float64,
+}
+
+
+def _column(name):
+    """Property that reads/writes this handle's row of one of the store's arrays"""
+    def get(self):
+        return getattr(self.store, name)[self.slot].item()
+
+    def set(self, value):
+        getattr(self.store, name)[self.slot] = value
+
+    return property(get, set)
+
+
+#Handle for one drone
+class Enemy:
+    """One drone in an EnemyStore, its fields are views into the store's arrays (slot is its row)"""
+    kind = "enemy"
+
+    center_x = _column("x")
+    center_y = _column("y")
+    prev_x = _column("prev_x")
+    prev_y = _column("prev_y")
+    change_x = _column("vx")
+    change_y = _column("vy")
+    animation_start = _column("anim_start")
+    current_frame = _column("frame")
+    health = _column("health")
+
+    def __init__(self):
+        self.store = None
+        self.slot = None
+        self.drone_number = 1
+        self.width = self.height = 0
+        self.box = (0, 0, 0, 0)
+        self.expiry = None  # whatever the owner schedules for this drone, the store leaves it alone
+
+    def reset(self, store, slot, drone_number, size):
+        """Point this handle at a freshly filled row"""
+        self.store = store
+        self.slot = slot
+        self.drone_number = drone_number
+        self.width, self.height, self.box = size
+        self.expiry = None
+
+    def place(self, x, y):
+        """Jump straight to a position (no interpolation from the old one)"""
+        self.center_x = self.prev_x = x
+        self.center_y = self.prev_y = y
+
+    @property
+    def left(self):
+        return self.center_x + self.box[0]
+
+    @property
+    def bottom(self):
+        return self.center_y + self.box[1]
+
+    @property
+    def right(self):
+        return self.center_x + self.box[2]
+
+    @property
+    def top(self):
+        return self.center_y + self.box[3]
+
+
+#Structure of arrays for every live drone
+class EnemyStore:
+    """Packed NumPy arrays of drone state plus one pooled Enemy handle per row"""
+
+    def __init__(self, sizes, clip, capacity=ENEMY_STORE_CAPACITY, pool_size=64):
+        """
+        sizes maps drone_number -> (width, height, (left, bottom, right, top)) hit box,
+        clip is the animation.Clip every drone loops
+        """
+        self.sizes = sizes
+        self.clip = clip
+        self.count = 0
+        self.capacity = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(0, dtype))
+        self._grow(capacity)
+
+        self.handles = []  # handles[row] is the Enemy for that row
+        self.pool = ObjectPool(Enemy, pool_size)
+        self.pool.prefill()
+
+    def _grow(self, capacity):
+        for name in COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def spawn(self, x, y, drone_number, speed, health=1, anim_start=0.0):
+        """Add a drone moving right at speed and return its handle, its animation counts from anim_start"""
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        row = self.count
+        self.count += 1
+        size = self.sizes[drone_number]
+        box_left, box_bottom, box_right, box_top = size[2]
+
+        self.x[row] = self.prev_x[row] = x
+        self.y[row] = self.prev_y[row] = y
+        self.vx[row] = speed
+        self.vy[row] = 0
+        self.anim_start[row] = anim_start
+        self.frame[row] = 0
+        self.frame_changed[row] = False
+        self.drone_type[row] = drone_number
+        self.health[row] = health
+        self.box_left[row] = box_left
+        self.box_bottom[row] = box_bottom
+        self.box_right[row] = box_right
+        self.box_top[row] = box_top
+
+        enemy = self.pool.acquire(self, row, drone_number, size)
+        self.handles.append(enemy)
+        return enemy
+
+    def remove(self, enemy):
+        """Take a drone out, the last row is moved into its place so the arrays stay packed"""
+        row = enemy.slot
+        last = self.count - 1
+        if row != last:
+            for name in COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            moved = self.handles[last]
+            moved.slot = row
+            self.handles[row] = moved
+        self.handles.pop()
+        self.count = last
+        enemy.store = None
+        enemy.slot = None
+        self.pool.release(enemy)
+
+    def remove_many(self, enemies):
+        """
+        Take several drones out at once. A few get swapped out one by one, a big share of the store is
+        one pass that packs the rest to the front in order (the handle list gets rebuilt either way then)
+        """
+        if len(enemies) * COMPACT_FRACTION < self.count:
+            for enemy in enemies:
+                self.remove(enemy)
+            return
+        n = self.count
+        keep = np.ones(n, np.bool_)
+        keep[[enemy.slot for enemy in enemies]] = False
+        rows = np.flatnonzero(keep)
+        alive = len(rows)
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:alive] = column[rows]
+        handles = self.handles
+        self.handles = [handles[row] for row in rows.tolist()]
+        for slot, enemy in enumerate(self.handles):
+            enemy.slot = slot
+        self.count = alive
+        release = self.pool.release
+        for enemy in enemies:
+            enemy.store = None
+            enemy.slot = None
+            release(enemy)
+
+    def clear(self):
+        """Take every drone out at once and return (xs, ys) arrays of where they were"""
+        n = self.count
+        xs = self.x[:n].copy()
+        ys = self.y[:n].copy()
+        release = self.pool.release
+        for enemy in self.handles:
+            enemy.store = None
+            enemy.slot = None
+            release(enemy)
+        self.handles = []
+        self.frame_changed[:n] = False
+        self.count = 0
+        return xs, ys
+
+    def remember_positions(self):
+        """Save where every drone is before it moves, for render interpolation"""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def step(self, frames):
+        """Move every drone, frames is the step length in 1/60 s units (what the speeds are in)"""
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n] * frames
+        self.y[:n] += self.vy[:n] * frames
+
+    def animate(self, time):
+        """Work out every drone's frame at animation clock time, flagging the ones that changed"""
+        n = self.count
+        if not n:
+            return
+        frames = self.clip.frames_at(time - self.anim_start[:n])
+        self.frame_changed[:n] |= frames != self.frame[:n]
+        self.frame[:n] = frames
+
+    def bounds(self):
+        """(left, bottom, right, top) arrays of every live drone's hit box"""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        return (x + self.box_left[:n], y + self.box_bottom[:n],
+                x + self.box_right[:n], y + self.box_top[:n])
+
+    def collision_index(self, queries=1):
+        """
+        Index of every drone's hit box as they are now for about queries box queries, query() gives
+        rows lowest first. Nothing may move or be removed while it's in use
+        """
+        return collision_index(self.bounds(), queries)
+
+    def interpolated(self, alpha):
+        """Lists of x and y for every drone, alpha of the way from its previous step to its current one"""
+        n = self.count
+        prev_x = self.prev_x[:n]
+        prev_y = self.prev_y[:n]
+        return ((prev_x + (self.x[:n] - prev_x) * alpha).tolist(),
+                (prev_y + (self.y[:n] - prev_y) * alpha).tolist())
+
+    def take_frame_changes(self):
+        """(rows, frames) lists of the drones whose frame changed since the last call, and clear the flags"""
+        changed = self.frame_changed[:self.count]
+        rows = np.flatnonzero(changed)
+        if not len(rows):
+            return (), ()
+        changed[rows] = False
+        return rows.tolist(), self.frame[rows].tolist()
+
+    def __iter__(self):
+        return iter(self.handles)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,42 @@
+# ENTITY REGISTRY
+# Keeps game objects (the bullets, drones live in enemy_store) in a plain list plus a key -> slot dict,
+# so removing one is O(1)
+
+
+#Dense list with swap-remove
+class EntityRegistry:
+    """Holds game objects with O(1) removal"""
+
+    def __init__(self, key=id):
+        """key(obj) gives the id an object's slot is kept under, the object's own id by default"""
+        self.key = key
+        self.items = []
+        self.slots = {}  # key -> index into items
+
+    def add(self, obj):
+        """Start tracking an object"""
+        self.slots[self.key(obj)] = len(self.items)
+        self.items.append(obj)
+
+    def remove(self, obj):
+        """Stop tracking an object, the last object is moved into its slot so nothing has to shift"""
+        slot = self.slots.pop(self.key(obj))
+        last = self.items.pop()
+        if last is not obj:
+            self.items[slot] = last
+            self.slots[self.key(last)] = slot
+
+    def snapshot(self):
+        """Copy of the current objects, safe to loop over while removing"""
+        return list(self.items)
+
+    def clear(self):
+        """Forget every object"""
+        self.items.clear()
+        self.slots.clear()
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,94 @@
+# GAME EVENTS
+# Collision and despawn checks don't act on what they find, they queue kill and damage events instead.
+# The queue is flushed once at the end of a step: a drone that gets killed twice in the same step (shot
+# and breached, rammed by the player during a wipe) only counts the first time, and every subscriber
+# (explosions, score, taking the drones out, hearts and game over) gets the whole step's worth in one call
+# A wipe is one event for every drone at once, so a big wave goes without queueing its drones one by one
+from collections import defaultdict
+
+# Why a drone died
+SHOT = "shot"  # run out of health from bullets
+RAMMED = "rammed"  # flew into the player
+BREACHED = "breached"  # made it to the right edge
+WIPED = "wiped"  # caught by the powerup wipe
+
+# Event kinds subscribers can listen for
+KILL = "kill"  # callback(enemies, causes), lists in the order they were queued
+WIPE = "wipe"  # callback(cause), every drone not already killed this step dies
+DAMAGE = "damage"  # callback(amount, causes), amount is the total hearts lost this step
+
+
+#One step's worth of kills and damage
+class EventQueue:
+    """Kill and damage events collected over a step, flush() hands them to the subscribers"""
+
+    def __init__(self):
+        self.subscribers = defaultdict(list)
+        self.kills = {}  # id(enemy) -> (enemy, cause), the first cause queued wins
+        self.damage = []  # causes, one entry per heart
+        self.wipe = None  # cause of the wipe queued this step, if there is one
+        self.flushed_kills = 0
+        self.flushed_wipes = 0
+        self.duplicates = 0
+
+    def subscribe(self, kind, callback):
+        """Call callback with every flushed batch of kind, subscribers run in the order they subscribed"""
+        self.subscribers[kind].append(callback)
+
+    def kill(self, enemy, cause):
+        """Queue a drone to die, returns False if it was already queued (or wiped) this step"""
+        key = id(enemy)
+        if self.wipe is not None or key in self.kills:
+            self.duplicates += 1
+            return False
+        self.kills[key] = (enemy, cause)
+        return True
+
+    def kill_all(self, cause):
+        """Queue every drone to die, the ones queued before keep their own cause"""
+        if self.wipe is None:
+            self.wipe = cause
+
+    def hurt(self, cause, amount=1):
+        """Queue amount hearts of damage to the player"""
+        self.damage.extend([cause] * amount)
+
+    def doomed(self, enemy):
+        """True if the drone is already queued to die, collisions should leave it alone"""
+        return self.wipe is not None or id(enemy) in self.kills
+
+    def flush(self):
+        """Hand everything queued since the last flush to the subscribers, kills first, then a wipe"""
+        kills = self.kills
+        damage = self.damage
+        wipe = self.wipe
+        self.kills = {}
+        self.damage = []
+        self.wipe = None
+        if kills:
+            enemies = [enemy for enemy, _ in kills.values()]
+            causes = [cause for _, cause in kills.values()]
+            self.flushed_kills += len(enemies)
+            for callback in self.subscribers[KILL]:
+                callback(enemies, causes)
+        if wipe is not None:
+            self.flushed_wipes += 1
+            for callback in self.subscribers[WIPE]:
+                callback(wipe)
+        if damage:
+            for callback in self.subscribers[DAMAGE]:
+                callback(len(damage), damage)
+
+    def clear(self):
+        """Drop anything queued without telling anyone"""
+        self.kills = {}
+        self.damage = []
+        self.wipe = None
+
+    def stats(self):
+        """Counters for the benchmark"""
+        return {
+            "kills": self.flushed_kills,
+            "wipes": self.flushed_wipes,
+            "duplicates": self.duplicates,
+        }
@@ -0,0 +1,96 @@
+# HUD
+# Score, hearts and the powerup cooldown bar, kept as ready-made text and sprites that only change when
+# the numbers they show change, then drawn with one sprite list draw and one text batch draw
+import arcade
+import pyglet
+
+from assets import ASSETS
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Powerup cooldown bar layout
+BAR_LEFT = 32
+BAR_BOTTOM = SCREEN_HEIGHT - 96
+BAR_WIDTH = 192
+BAR_HEIGHT = 12
+
+
+def _solid(left, bottom, width, height, color):
+    """A solid colour sprite placed by its bottom left corner"""
+    sprite = arcade.SpriteSolidColor(width, height, color=color)
+    sprite.left = left
+    sprite.bottom = bottom
+    return sprite
+
+
+#The heads up display
+class Hud:
+    """Retained score/health/cooldown display, call update() every frame and draw() when playing"""
+
+    def __init__(self):
+        # All the text shares one batch so it's drawn in one go
+        self.batch = pyglet.graphics.Batch()
+        self.score_text = arcade.Text(
+            "Score: 0", 10, SCREEN_HEIGHT - 30, arcade.color.WHITE,
+            font_size=20, bold=True, batch=self.batch
+        )
+        self.power_label = arcade.Text(
+            "E:", 6, SCREEN_HEIGHT - 98, arcade.color.WHITE,
+            font_size=20, bold=True, batch=self.batch
+        )
+        # Final score on the game over screen, drawn on its own
+        self.final_score_text = arcade.Text(
+            "0", SCREEN_WIDTH / 2 + 20, SCREEN_HEIGHT / 2 - 55, arcade.color.EARTH_YELLOW,
+            font_size=30, anchor_x="center"
+        )
+
+        # Heart bar plus the cooldown bar (black frame, green fill, see-through black "still charging" part)
+        self.sprites = arcade.SpriteList()
+        self.heart_bar = arcade.Sprite(ASSETS.frame("HEART_BAR_3"))
+        self.cooldown_shade = _solid(BAR_LEFT, BAR_BOTTOM, BAR_WIDTH, BAR_HEIGHT, (0, 0, 0, 150))
+        self.sprites.append(self.heart_bar)
+        self.sprites.append(_solid(28, SCREEN_HEIGHT - 100, 200, 20, arcade.color.BLACK))
+        self.sprites.append(_solid(BAR_LEFT, BAR_BOTTOM, BAR_WIDTH, BAR_HEIGHT, arcade.color.GREEN))
+        self.sprites.append(self.cooldown_shade)
+
+        # What's showing right now, so update() can tell when something changed
+        self.score = None
+        self.health = None
+        self.shade_width = None
+        self.final_score = None
+
+    def update(self, score, health, power_cooldown, power_cooldown_time):
+        """Bring the display up to date, only touching the parts whose value changed"""
+        if score != self.score:
+            self.score = score
+            self.score_text.text = f"Score: {score}"
+
+        if health != self.health:
+            self.health = health
+            # only draw if there is heart remaining
+            self.heart_bar.visible = health > 0
+            if health > 0:
+                self.heart_bar.texture = ASSETS.frame(f"HEART_BAR_{health}")
+                # Right below the score
+                self.heart_bar.left = 8
+                self.heart_bar.bottom = SCREEN_HEIGHT - 70
+
+        #shrink black transparent cooldown, to the nearest whole pixel
+        shade_width = round(BAR_WIDTH * max(power_cooldown, 0) / power_cooldown_time)
+        if shade_width != self.shade_width:
+            self.shade_width = shade_width
+            self.cooldown_shade.visible = shade_width > 0
+            if shade_width > 0:
+                self.cooldown_shade.width = shade_width
+                self.cooldown_shade.left = BAR_LEFT
+
+    def draw(self):
+        """Draw the in-game HUD"""
+        self.sprites.draw()
+        self.batch.draw()
+
+    def draw_final_score(self, score):
+        """Draw the score on the game over screen"""
+        if score != self.final_score:
+            self.final_score = score
+            self.final_score_text.text = f"{score}"
+        self.final_score_text.draw()
@@ -0,0 +1,10 @@
+# METRICS
+# Small number crunching shared by the benchmark, replays, balancing sweeps and the in-game latency
+# numbers, kept here so the game itself doesn't have to import any of those scripts
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
@@ -0,0 +1,158 @@
+# FRAME PACING AND INPUT LATENCY
+# FramePacer: instead of updating as soon as a frame starts and then sitting on the finished frame until
+# it gets shown, wait until just before the next present (leaving room for how long update and draw have
+# been taking lately), then read input, update and draw. The frame that goes out has the newest input in it
+# Presents are expected on the same cadence as the last one, which is the refresh with vsync (the window
+# turns it on for pacing). The wait never runs past the next draw tick either, where the swap doesn't
+# block (no vsync, or a driver that ignores it) the ticks are the only schedule there is
+# LatencyMonitor: time from a key press to the first present that shows a simulation step that used it,
+# kept as a rolling history so the overlay and the exit report can give percentiles
+from collections import deque
+import json
+import time
+
+from metrics import percentile
+
+# Frames of update+draw time the pacer looks back over, and which percentile of them it plans around
+PACING_HISTORY = 120
+PACING_PERCENTILE = 0.95
+# Extra room left before the present for the OS scheduler waking us late
+PACING_MARGIN = 0.002
+# Frames to measure before the pacer starts waiting at all
+PACING_WARMUP = 10
+
+# Input latencies kept for the percentiles
+LATENCY_HISTORY = 2000
+
+
+#Late update scheduling
+class FramePacer:
+    """Call wait() right before updating, rendered() right before the buffer swap and presented() after it"""
+
+    def __init__(self, frame_time=1 / 60, margin=PACING_MARGIN, history=PACING_HISTORY):
+        """frame_time is the seconds between presents, the screen's refresh interval when vsync is on"""
+        self.frame_time = frame_time
+        self.margin = margin
+        self.work = deque(maxlen=history)  # seconds from wait() returning to rendered()
+        self.work_start = None
+        self.last_update = None
+        self.last_present = None
+        self.planned_present = None  # when wait() planned this frame to go out, None if it didn't plan
+        self.waited = 0.0
+        self.frames = 0
+        self.slept_frames = 0
+        self.slept_total = 0.0
+        self.slept_max = 0.0
+
+    def budget(self):
+        """Seconds to leave before the present for update and draw"""
+        return percentile(sorted(self.work), PACING_PERCENTILE) + self.margin
+
+    def wait(self):
+        """Sleep until as late as it's safe to start the frame, returns how long it slept"""
+        now = time.perf_counter()
+        slept = 0.0
+        budget = self.budget() if len(self.work) >= PACING_WARMUP else None
+        self.planned_present = None
+        # Frames that take longer than a frame_time have no time to give back
+        if self.last_present is not None and budget is not None and budget < self.frame_time:
+            # The next present slot we can still make, past ones are already missed (or were the tick
+            # that started this frame) so starting for them would only show older input
+            present = self.last_present + self.frame_time
+            while present - budget <= now:
+                present += self.frame_time
+            # Taking this frame past the next tick would make the clock drop that one
+            present = min(present, now + self.frame_time)
+            self.planned_present = present
+            time.sleep(present - budget - now)
+            slept = time.perf_counter() - now
+            self.slept_frames += 1
+            self.slept_total += slept
+            self.slept_max = max(self.slept_max, slept)
+        self.frames += 1
+        self.waited = slept
+        self.work_start = time.perf_counter()
+        return slept
+
+    def delta_time(self):
+        """Seconds since the last paced update started, what to advance the game by"""
+        now = self.work_start
+        delta = self.frame_time if self.last_update is None else now - self.last_update
+        self.last_update = now
+        return delta
+
+    def rendered(self):
+        """The frame is drawn, the swap comes next"""
+        if self.work_start is not None:
+            self.work.append(time.perf_counter() - self.work_start)
+            self.work_start = None
+
+    def presented(self):
+        """
+        The swap returned, the next present is expected a frame_time after this one. A swap that came
+        back before the planned present didn't wait for a refresh, so the plan stands rather than the
+        schedule creeping earlier every frame
+        """
+        now = time.perf_counter()
+        if self.planned_present is not None and self.planned_present > now:
+            now = self.planned_present
+        self.last_present = now
+
+    def stats(self):
+        """How often and how long the pacer slept, and the budget it's planning around, in milliseconds"""
+        return {
+            "frames": self.frames,
+            "slept_frames": self.slept_frames,
+            "sleep_mean_ms": self.slept_total / self.slept_frames * 1000 if self.slept_frames else 0.0,
+            "sleep_max_ms": self.slept_max * 1000,
+            "budget_ms": self.budget() * 1000 if self.work else 0.0,
+        }
+
+
+#Input to screen latency
+class LatencyMonitor:
+    """Timestamps key presses and measures them against the present that first shows their effect"""
+
+    def __init__(self, history=LATENCY_HISTORY):
+        self.waiting = []  # inputs no simulation step has used yet
+        self.stepped = []  # used by a step, not on screen yet
+        self.samples = deque(maxlen=history)
+
+    def input(self):
+        """A key press came in"""
+        self.waiting.append(time.perf_counter())
+
+    def consumed(self):
+        """A simulation step ran with every input so far"""
+        self.stepped.extend(self.waiting)
+        self.waiting.clear()
+
+    def discard(self):
+        """The inputs so far went to a step that isn't gameplay, they don't get timed"""
+        self.waiting.clear()
+
+    def presented(self):
+        """A frame went to the screen"""
+        if self.stepped:
+            now = time.perf_counter()
+            self.samples.extend(now - start for start in self.stepped)
+            self.stepped.clear()
+
+    def report(self):
+        """Input to present latency percentiles in milliseconds"""
+        ordered = sorted(self.samples)
+        return {
+            "inputs": len(ordered),
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p90_ms": percentile(ordered, 0.90) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        }
+
+    def save_report(self, path, pacer=None):
+        """Write report() to path as JSON, with the FramePacer's stats() under "pacing" if there is one"""
+        report = self.report()
+        if pacer is not None:
+            report["pacing"] = pacer.stats()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,85 @@
+# PARTICLE RENDERER
+# Draws every live particle from the simulation's ParticleSystem as one batch of GL points: the arrays get
+# packed into a single vertex buffer each frame and drawn with one render call, no sprites involved
+import numpy as np
+from arcade.gl import BufferDescription
+from pyglet import gl
+
+# x, y, r, g, b, a, size per point
+FLOATS_PER_PARTICLE = 7
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_position;
+in vec4 in_color;
+in float in_size;
+
+out vec4 v_color;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_position, 0.0, 1.0);
+    gl_PointSize = in_size;
+    v_color = in_color;
+}
+"""
+
+# Round points that are brightest in the middle
+FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+
+out vec4 out_color;
+
+void main() {
+    float d = length(gl_PointCoord - vec2(0.5)) * 2.0;
+    if (d > 1.0) discard;
+    out_color = vec4(v_color.rgb, v_color.a * (1.0 - d * d));
+}
+"""
+
+
+#Draws a ParticleSystem
+class ParticleRenderer:
+    """One vertex buffer sized for the whole particle cap, refilled and drawn once per frame"""
+
+    def __init__(self, ctx, particles):
+        """ctx is the window's arcade.gl Context, particles the ParticleSystem to draw"""
+        self.ctx = ctx
+        self.particles = particles
+        self.vertices = np.zeros((particles.capacity, FLOATS_PER_PARTICLE), np.float32)
+        self.buffer = ctx.buffer(reserve=self.vertices.nbytes)
+        self.geometry = ctx.geometry(
+            [BufferDescription(self.buffer, "2f 4f 1f", ["in_position", "in_color", "in_size"])],
+            mode=ctx.POINTS,
+        )
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+
+    def draw(self):
+        """Upload the live particles and draw them, alpha fades out over each particle's life"""
+        particles = self.particles
+        n = particles.count
+        if not n:
+            return
+        vertices = self.vertices[:n]
+        vertices[:, 0] = particles.x[:n]
+        vertices[:, 1] = particles.y[:n]
+        vertices[:, 2:5] = particles.color[:n, :3]
+        vertices[:, 2:5] *= 1 / 255
+        vertices[:, 5] = particles.fade()
+        vertices[:, 6] = particles.size[:n]
+        self.buffer.write(vertices)
+
+        # Additive blending weighted by alpha, overlapping sparks glow brighter and fade out smoothly
+        ctx = self.ctx
+        with ctx.enabled(ctx.BLEND, gl.GL_PROGRAM_POINT_SIZE):
+            blend = ctx.blend_func
+            ctx.blend_func = ctx.SRC_ALPHA, ctx.ONE
+            self.geometry.render(self.program, vertices=n)
+            ctx.blend_func = blend
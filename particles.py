@@ -0,0 +1,169 @@
+# PARTICLES
+# Explosions are bursts of little glowing dots instead of a whole sprite each. Every particle's state
+# (position, velocity, age, colour, size) lives in NumPy arrays so thousands of them move in a few array
+# operations and the window can hand the lot to the GPU in one draw call
+# There is a hard cap: when it's reached new bursts get thinner and the oldest particles make way,
+# so a powerup wipe of hundreds of drones still looks big but never costs more than the cap
+import numpy as np
+
+# Most particles alive at once, and how many one explosion sends out when there's room
+PARTICLE_CAP = 4096
+PARTICLES_PER_EXPLOSION = 24
+# Bursts never get thinned below this many particles, past that whole bursts are dropped instead
+MIN_BURST = 4
+
+# Look and motion, speeds are in pixels per second
+PARTICLE_LIFETIME = (0.25, 0.6)  # seconds, picked at random per particle
+PARTICLE_SPEED = (60, 260)
+PARTICLE_SIZE = (3.0, 8.0)  # point size in pixels
+PARTICLE_DRAG = 3.0  # fraction of the speed lost per second
+PARTICLE_GRAVITY = -150
+# Hot to cold, white-yellow core through orange to dark red
+PARTICLE_COLORS = np.array([
+    (255, 245, 200, 255),
+    (255, 200, 80, 255),
+    (255, 130, 40, 255),
+    (220, 70, 25, 255),
+], np.uint8)
+
+# name -> dtype of every per-particle array
+COLUMNS = {
+    "x": np.float32,
+    "y": np.float32,
+    "vx": np.float32,
+    "vy": np.float32,
+    "age": np.float32,
+    "lifetime": np.float32,
+    "size": np.float32,
+}
+
+
+#All the live particles
+class ParticleSystem:
+    """Packed arrays of particle state, emit() bursts into it and step() moves and expires them"""
+
+    def __init__(self, capacity=PARTICLE_CAP, seed=None):
+        """seed feeds the system's own random numbers, so particles never touch the game's rng"""
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        self.color = np.zeros((capacity, 4), np.uint8)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Drop every particle and restart the random numbers from seed"""
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.peak = 0
+        self.emitted = 0
+        self.thinned = 0  # particles that didn't get emitted because of the cap
+        self.retired = 0  # particles cut short to make room
+
+    def emit(self, xs, ys, per_burst=PARTICLES_PER_EXPLOSION):
+        """
+        Send out one burst of per_burst particles at each (x, y). If that's more than the cap every burst
+        gets thinner (down to MIN_BURST), then the oldest bursts are left out, and anything still
+        short of room replaces the particles closest to dying
+        """
+        xs = np.asarray(xs, np.float32).ravel()
+        ys = np.asarray(ys, np.float32).ravel()
+        bursts = len(xs)
+        if not bursts or per_burst < 1:
+            return 0
+        wanted = bursts * per_burst
+        if wanted > self.capacity:
+            per_burst = max(min(per_burst, self.capacity // bursts), min(MIN_BURST, per_burst))
+            if bursts * per_burst > self.capacity:
+                keep = max(self.capacity // per_burst, 1)
+                xs = xs[-keep:]
+                ys = ys[-keep:]
+                bursts = keep
+                per_burst = min(per_burst, self.capacity)
+        total = bursts * per_burst
+        self.thinned += wanted - total
+
+        # Make room by retiring the particles furthest through their lives
+        short = total - (self.capacity - self.count)
+        if short > 0:
+            self._retire_oldest(short)
+
+        start = self.count
+        end = start + total
+        # One batch of random numbers for everything, small bursts are mostly call overhead
+        angle, speed, lifetime, size, color = self.rng.random((5, total))
+        angle *= 2 * np.pi
+        speed *= PARTICLE_SPEED[1] - PARTICLE_SPEED[0]
+        speed += PARTICLE_SPEED[0]
+        self.x[start:end] = np.repeat(xs, per_burst)
+        self.y[start:end] = np.repeat(ys, per_burst)
+        self.vx[start:end] = np.cos(angle) * speed
+        self.vy[start:end] = np.sin(angle) * speed
+        self.age[start:end] = 0
+        self.lifetime[start:end] = PARTICLE_LIFETIME[0] + lifetime * (PARTICLE_LIFETIME[1] - PARTICLE_LIFETIME[0])
+        self.size[start:end] = PARTICLE_SIZE[0] + size * (PARTICLE_SIZE[1] - PARTICLE_SIZE[0])
+        self.color[start:end] = PARTICLE_COLORS[(color * len(PARTICLE_COLORS)).astype(np.intp)]
+        self.count = end
+        self.emitted += total
+        self.peak = max(self.peak, end)
+        return total
+
+    def _retire_oldest(self, amount):
+        n = self.count
+        if amount >= n:
+            self.retired += n
+            self.count = 0
+            return
+        progress = self.age[:n] / self.lifetime[:n]
+        oldest = np.argpartition(progress, n - amount)[n - amount:]
+        keep = np.ones(n, np.bool_)
+        keep[oldest] = False
+        self.retired += amount
+        self._compact(keep)
+
+    def _compact(self, keep):
+        """Pack the rows where keep is True at the front, in order"""
+        rows = np.flatnonzero(keep)
+        alive = len(rows)
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:alive] = column[rows]
+        self.color[:alive] = self.color[rows]
+        self.count = alive
+
+    def step(self, delta_time):
+        """Age, slow down and move every particle, then drop the ones that have burned out"""
+        n = self.count
+        if not n:
+            return
+        self.age[:n] += delta_time
+        damping = max(1.0 - PARTICLE_DRAG * delta_time, 0.0)
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        vx *= damping
+        vy *= damping
+        vy += PARTICLE_GRAVITY * delta_time
+        self.x[:n] += vx * delta_time
+        self.y[:n] += vy * delta_time
+        alive = self.age[:n] < self.lifetime[:n]
+        if not alive.all():
+            self._compact(alive)
+
+    def fade(self):
+        """How much of each live particle's life is left, 1 when it's new down to 0"""
+        n = self.count
+        return 1.0 - self.age[:n] / self.lifetime[:n]
+
+    def stats(self):
+        """Counts for the benchmark and the profiler"""
+        return {
+            "live": self.count,
+            "peak": self.peak,
+            "capacity": self.capacity,
+            "emitted": self.emitted,
+            "thinned": self.thinned,
+            "retired": self.retired,
+        }
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,67 @@
+# OBJECT POOLS
+# Enemies and bullets get recycled instead of being thrown away, so heavy waves don't churn the allocator
+
+
+#Generic fixed capacity pool
+class ObjectPool:
+    """Keeps up to capacity spare objects around and hands them back out with reset()"""
+
+    def __init__(self, factory, capacity):
+        """
+        factory() builds a brand new object, every object must have a reset(...) method
+        """
+        self.factory = factory
+        self.capacity = capacity
+        self.free = []
+
+        # Usage stats
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0  # released while the pool was already full, left for the garbage collector
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def prefill(self, count=None):
+        """Build objects ahead of time so the first wave doesn't allocate"""
+        count = self.capacity if count is None else min(count, self.capacity)
+        while len(self.free) < count:
+            self.free.append(self.factory())
+            self.created += 1
+
+    def acquire(self, *args, **kwargs):
+        """Take a spare object (or build one if there are none left) and reset it with the given arguments"""
+        if self.free:
+            obj = self.free.pop()
+            self.reused += 1
+        else:
+            obj = self.factory()
+            self.created += 1
+        obj.reset(*args, **kwargs)
+
+        self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Give an object back, it is kept for reuse unless the pool is already full"""
+        self.in_use -= 1
+        self.released += 1
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        """Return the usage counters as a dict"""
+        return {
+            "capacity": self.capacity,
+            "free": len(self.free),
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "created": self.created,
+            "reused": self.reused,
+            "released": self.released,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,110 @@
+# FRAME PROFILER
+# Times named phases of each frame (background scroll, collisions, each draw list...) and keeps a rolling
+# breakdown for the on-screen overlay, it can also save a Chrome trace (open it in chrome://tracing or Perfetto)
+# When it's off, phase() hands back one shared do-nothing context manager so the cost is basically zero
+from collections import deque
+from contextlib import nullcontext
+import json
+import time
+
+# Frames the rolling breakdown averages over
+HISTORY_FRAMES = 120
+# Trace events kept for the Chrome trace, oldest ones fall off
+MAX_TRACE_EVENTS = 200_000
+
+_OFF = nullcontext()
+
+
+#Times one phase
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+
+#Per phase frame profiler
+class FrameProfiler:
+    """Collects per-phase timings while enabled, see phase(), end_frame() and breakdown()"""
+
+    def __init__(self, history=HISTORY_FRAMES, max_events=MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.history = deque(maxlen=history)  # one {phase: seconds} dict per finished frame
+        self.events = deque(maxlen=max_events)  # (name, start, end) in perf_counter seconds
+        self.current = {}
+        self.frame_start = None
+        self.origin = time.perf_counter()
+
+    def toggle(self):
+        """Turn profiling on or off, turning it on starts a fresh breakdown"""
+        self.enabled = not self.enabled
+        self.history.clear()
+        self.current = {}
+        self.frame_start = None
+        return self.enabled
+
+    def phase(self, name):
+        """Context manager that times the code inside it as the named phase"""
+        if not self.enabled:
+            return _OFF
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        """Add one timed phase to the current frame and the trace"""
+        self.current[name] = self.current.get(name, 0.0) + (end - start)
+        self.events.append((name, start, end))
+        if self.frame_start is None:
+            self.frame_start = start
+
+    def end_frame(self):
+        """Close off the current frame, call once per rendered frame"""
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        if self.frame_start is not None:
+            self.events.append(("frame", self.frame_start, end))
+            self.current["frame"] = end - self.frame_start
+        self.history.append(self.current)
+        self.current = {}
+        self.frame_start = None
+
+    def breakdown(self):
+        """Average milliseconds per frame for each phase over the rolling history, slowest first"""
+        if not self.history:
+            return []
+        totals = {}
+        for frame in self.history:
+            for name, seconds in frame.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        frames = len(self.history)
+        averages = [(name, seconds / frames * 1000) for name, seconds in totals.items()]
+        averages.sort(key=lambda item: item[1], reverse=True)
+        return averages
+
+    def chrome_trace(self):
+        """The recorded events in Chrome's trace event format"""
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": 1,
+                    "tid": 1,
+                }
+                for name, start, end in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def dump_chrome_trace(self, path):
+        """Write the recorded events to path as Chrome trace JSON"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return len(self.events)
@@ -0,0 +1,125 @@
+# INPUT RECORDING AND REPLAY
+# The window can record a session (every frame's delta_time, the key presses that went into it and the
+# random seed) and this replays it headless as fast as the CPU goes, checking the game state every frame
+# matches what was recorded, so a player's bad session turns into a repeatable test and benchmark
+#   python Robot_Uprising.py --record session.json   play and record
+#   python replay.py session.json                    replay, check and time it
+import argparse
+import json
+import sys
+import time
+
+from metrics import percentile
+from simulation import Action, GameSimulation
+
+SESSION_VERSION = 1
+
+
+#Records what the window feeds the simulation
+class Recorder:
+    """Collects one (delta_time, inputs, state hash) entry per on_update, start() it before the first frame"""
+
+    def __init__(self):
+        self.seed = None
+        self.rng_state = None
+        self.frames = []
+
+    def start(self, sim):
+        """Remember where the simulation's random numbers are at, everything after this gets recorded"""
+        self.seed = sim.seed
+        self.rng_state = sim.rng.getstate()
+        self.frames = []
+
+    def record(self, delta_time, inputs, sim):
+        """Add a frame, inputs is the list of (Action, pressed) events passed to sim.advance"""
+        self.frames.append((
+            delta_time,
+            [(action.name, pressed) for action, pressed in inputs],
+            sim.state_hash(),
+        ))
+
+    def session(self):
+        """The recording as a JSON-ready dict"""
+        version, internal, gauss = self.rng_state
+        return {
+            "version": SESSION_VERSION,
+            "seed": self.seed,
+            "rng_state": [version, list(internal), gauss],
+            "frames": self.frames,
+        }
+
+    def save(self, path):
+        """Write the recording to path"""
+        with open(path, "w") as f:
+            json.dump(self.session(), f)
+        return len(self.frames)
+
+
+def load_session(path):
+    """Read a recorded session, the inputs come back as (Action, pressed) tuples"""
+    with open(path) as f:
+        session = json.load(f)
+    if session.get("version") != SESSION_VERSION:
+        raise ValueError(f"{path}: unsupported session version {session.get('version')}")
+    version, internal, gauss = session["rng_state"]
+    session["rng_state"] = (version, tuple(internal), gauss)
+    session["frames"] = [
+        (delta_time, [(Action[name], pressed) for name, pressed in inputs], state_hash)
+        for delta_time, inputs, state_hash in session["frames"]
+    ]
+    return session
+
+
+def replay(session, check=True):
+    """
+    Re-run a session without a window and return a report dict. With check on it stops at the
+    first frame whose state hash differs from the recording (reported as diverged_at)
+    """
+    sim = GameSimulation(session["seed"])
+    sim.rng.setstate(session["rng_state"])
+
+    frame_times = []
+    diverged_at = None
+    clock = time.perf_counter
+    for frame, (delta_time, inputs, expected) in enumerate(session["frames"]):
+        start = clock()
+        sim.advance(delta_time, inputs)
+        frame_times.append(clock() - start)
+        if check and sim.state_hash() != expected:
+            diverged_at = frame
+            break
+
+    ordered = sorted(frame_times)
+    total = sum(frame_times)
+    played = len(frame_times)
+    return {
+        "frames": played,
+        "recorded_frames": len(session["frames"]),
+        "game_time": sum(delta_time for delta_time, _, _ in session["frames"][:played]),
+        "diverged_at": diverged_at,
+        "mean_ms": total / played * 1000 if played else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "slowest_frame": frame_times.index(ordered[-1]) if ordered else None,
+        "frames_per_second": played / total if total else 0.0,
+        "score": sim.score,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded ROBOT UPRISING session headless")
+    parser.add_argument("session", help="session file written by Robot_Uprising.py --record")
+    parser.add_argument("--no-check", action="store_true", help="don't compare state hashes, just time it")
+    args = parser.parse_args(argv)
+
+    report = replay(load_session(args.session), check=not args.no_check)
+    print(json.dumps(report, indent=2))
+    if report["diverged_at"] is not None:
+        print(f"Replay diverged from the recording at frame {report['diverged_at']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,787 @@
+# HEADLESS SIMULATION
+# All of the game rules live here with no window or OpenGL, GameWindow just draws whatever this says
+# so the game can also be stepped on a CI box for benchmarks, balancing and regression tests
+import hashlib
+import random
+from enum import Enum
+
+from PIL import Image
+
+from animation import Animator, Clip, ClipMode
+from controls import ControlState
+from enemy_store import EnemyStore
+from entities import EntityRegistry
+from events import BREACHED, DAMAGE, KILL, RAMMED, SHOT, WIPE, WIPED, EventQueue
+from particles import PARTICLE_CAP, ParticleSystem
+from pools import ObjectPool
+from profiler import FrameProfiler
+from timers import TimerService
+from waves import DRONE_TYPES, WAVES_PATH, WavePlan, WaveScheduler
+
+# Constants - This is the adjusted screen size from tutorial
+SCREEN_WIDTH = 1280
+SCREEN_HEIGHT = 720
+
+# Fixed timestep, the game always advances in 1/120 s steps no matter how fast the screen refreshes
+FIXED_TIMESTEP = 1 / 120
+MAX_CATCH_UP_STEPS = 8  # after a long hitch, give up on the missing time instead of spiralling
+# All the speeds below are in pixels per 1/60 s (what they were tuned at), moves get scaled by this
+BASE_FRAME_RATE = 60
+
+# Player constants
+PLAYER_MOVEMENT_SPEED = 5
+PLAYER_HORIZONTAL_SPEED = 5
+
+PLAYER_X = 1100
+PLAYER_INITIAL_Y = SCREEN_HEIGHT // 2
+Bullet_speed = 26
+
+# Animation constants
+ATTACK_ANIMATION_SPEED = 0.05  # Time per frame in seconds
+JUMP_ANIMATION_SPEED = 0.03
+POWERUP_DURATION = 2.0  # How long the powerup lasts in seconds
+JUMPING_SPEED = 10
+HOLD_AT_POSITION_DURATION = 3.5  # How long to stay at top/bottom in seconds
+POWERUP_ENEMY_DESTRUCTION_TIME = 2.5  # When to destroy all enemies during powerup
+PLAYER_ATTACK_FRAMES = 6
+PLAYER_JUMP_FRAMES = 6
+ENEMY_ANIMATION_SPEED = 0.1  # Time per drone frame in seconds
+SYNC_DRONE_ANIMATION = False  # True runs every drone's loop in step instead of from when it spawned
+
+# Health constant
+PLAYER_MAX_HEALTH = 3
+# Points per drone, only kills the player earned count (see SCORING_CAUSES)
+POINTS_PER_KILL = 10
+SCORING_CAUSES = (SHOT, WIPED)
+
+# Default cooldowns in seconds (GameSimulation copies them into tunable attributes)
+BULLET_COOLDOWN_TIME = 0.4
+POWER_COOLDOWN_TIME = 45.0
+
+# Enemy drone sprite sheets are Enemy_Drone_{n}.png, a row of square frames (DRONE_TYPES comes from waves.py)
+DRONE_FRAMES = 4
+ENEMY_LANES = list(range(100, 671, 30))  # random y position in increments of 30 from 100 to 670
+ENEMY_HEALTH = 1  # bullet hits a drone takes
+
+# Pool sizes, how many spare enemies/bullets are kept around for reuse
+ENEMY_POOL_SIZE = 64
+BULLET_POOL_SIZE = 32
+
+# Sprite scales, the hit boxes are measured from the images at these sizes
+PLAYER_SCALE = 1.6
+ENEMY_SCALE = 1.2
+
+
+# Game state enumeration for managing different screens
+class GameState(Enum):
+    START_SCREEN = 1
+    PLAYING = 2
+    GAME_OVER = 3
+
+# Jump states
+class JumpState(Enum):
+    NOT_JUMPING = 0
+    MOVING_TO_POSITION = 1
+    HOLDING_AT_POSITION = 2
+    RETURNING_TO_ORIGINAL = 3
+
+# Player controls, the window maps keys onto these
+class Action(Enum):
+    UP = 0
+    DOWN = 1
+    LEFT = 2
+    RIGHT = 3
+    SHOOT = 4  # also starts/restarts the game from the start and game over screens
+    POWER = 5
+
+
+#Hit box measuring, roughly what arcade's simple hit box does: the box around the non-transparent pixels
+_hit_boxes = {}
+
+def hit_box(path, scale=1.0, square_frame=False):
+    """
+    Return (width, height, (left, bottom, right, top)) for an image at a scale,
+    the box is relative to the image centre. square_frame measures only the first frame of a sheet
+    """
+    key = (path, scale, square_frame)
+    if key not in _hit_boxes:
+        with Image.open(path) as image:
+            image = image.convert("RGBA")
+        if square_frame:
+            image = image.crop((0, 0, image.height, image.height))
+        w, h = image.size
+        x0, y0, x1, y1 = image.getchannel("A").getbbox() or (0, 0, w, h)
+        box = (
+            (x0 - w / 2) * scale,
+            (h / 2 - y1) * scale,
+            (x1 - w / 2) * scale,
+            (h / 2 - y0) * scale,
+        )
+        _hit_boxes[key] = (w * scale, h * scale, box)
+    return _hit_boxes[key]
+
+
+#Anything with a position and a hit box
+class Body:
+    """Position plus hit box, gives the left/right/bottom/top that collisions use"""
+
+    def __init__(self, size):
+        self.width, self.height, self.box = size
+        self.place(0, 0)
+
+    def place(self, x, y):
+        """Jump straight to a position (no interpolation from the old one)"""
+        self.center_x = x
+        self.center_y = y
+        self.prev_x = x
+        self.prev_y = y
+
+    def remember_position(self):
+        """Save the position at the start of a step so the window can draw in-between steps"""
+        self.prev_x = self.center_x
+        self.prev_y = self.center_y
+
+    @property
+    def left(self):
+        return self.center_x + self.box[0]
+
+    @property
+    def bottom(self):
+        return self.center_y + self.box[1]
+
+    @property
+    def right(self):
+        return self.center_x + self.box[2]
+
+    @property
+    def top(self):
+        return self.center_y + self.box[3]
+
+
+#Player setup class
+class Player(Body):
+    """Player position, jump/powerup state and which animation frame to show"""
+
+    def __init__(self, x, y, animator, timers):
+        """
+        Initialize player, the window looks at texture_set/texture_index to pick the frame to draw.
+        animator is the shared Animator that the "attack" and "jump" clips play on,
+        timers the simulation's TimerService that ends the hold at the top of the jump
+        """
+        super().__init__(hit_box("CA_0.png", PLAYER_SCALE))
+        self.place(x, y)
+        self.animator = animator
+        self.timers = timers
+
+        # which frame is showing, "attack" frames double as the idle pose (frame 0)
+        self.texture_set = "attack"
+        self.texture_index = 0
+
+        #animation state
+        self.is_jumping = False
+        self.is_powering = False
+        self.is_attacking = False
+        self.attack_start = 0  # animator time each clip started playing
+        self.jump_start = 0
+
+        # Jump movement state
+        self.jump_state = JumpState.NOT_JUMPING
+        self.hold_timer = None  # Timer that ends HOLDING_AT_POSITION
+        self.original_y = y
+
+        # Movement
+        self.change_y = 0
+        self.change_x = 0
+
+    #Start the firing animation
+    def start_attack(self):
+        """Start the attack animation, only start if not already attacking"""
+        if not self.is_attacking:
+            self.is_attacking = True
+            self.attack_start = self.animator.time
+
+    #Jumping motion, to be called in powerup
+    def start_jump(self):
+        """Start the jump animation, only start if not already jumping"""
+        if not self.is_jumping:
+            self.is_jumping = True
+            self.jump_start = self.animator.time
+            self.jump_state = JumpState.MOVING_TO_POSITION
+            self.original_y = self.center_y
+
+    #Start the power
+    def start_power(self):
+        """Start the powerup animation, returns False if one was already going"""
+        if self.is_powering:
+            return False
+        self.is_powering = True
+        self.start_jump()  # Start jump animation when powering up
+        return True
+
+    def end_hold(self):
+        """Hold timer callback, time to head back down"""
+        self.jump_state = JumpState.RETURNING_TO_ORIGINAL
+
+    #update player
+    def update(self, delta_time=0):
+        """Update player position and animation"""
+        frames = delta_time * BASE_FRAME_RATE
+
+        # Handle jump movement states
+        if self.jump_state == JumpState.MOVING_TO_POSITION:
+            # Move upward
+            self.center_y += JUMPING_SPEED * frames
+
+            # Check if reached top of screen
+            if self.center_y >= SCREEN_HEIGHT - self.height // 2:
+                self.center_y = SCREEN_HEIGHT - self.height // 2
+                #stay at position for duration, the timer service moves us on
+                self.jump_state = JumpState.HOLDING_AT_POSITION
+                self.hold_timer = self.timers.schedule(HOLD_AT_POSITION_DURATION, self.end_hold)
+
+        elif self.jump_state == JumpState.RETURNING_TO_ORIGINAL:
+            #Move back to original position
+            if self.center_y > self.original_y:
+                self.center_y -= JUMPING_SPEED * frames
+
+                # Check if reached original position
+                if self.center_y <= self.original_y:
+                    self.center_y = self.original_y
+                    self.jump_state = JumpState.NOT_JUMPING
+                    self.is_powering = False
+                    self.is_jumping = False
+
+        # Normal horizontal movement
+        if self.jump_state == JumpState.NOT_JUMPING:
+            self.center_y += self.change_y * frames
+            self.center_x += self.change_x * frames
+        else:
+            #Only allow horizontal movement during jump
+            self.center_x += self.change_x * frames
+
+        # Keep player within screen bounds
+        if self.jump_state == JumpState.NOT_JUMPING:
+            if self.center_y < self.height // 2 + 50:
+                self.center_y = self.height // 2 + 50
+            elif self.center_y > SCREEN_HEIGHT - self.height // 2:
+                self.center_y = SCREEN_HEIGHT - self.height // 2
+
+        if self.center_x < self.width // 2:
+            self.center_x = self.width // 2
+        elif self.center_x > SCREEN_WIDTH - self.width // 2:
+            self.center_x = SCREEN_WIDTH - self.width // 2
+
+        #Update animation, the frame comes from how long the clip has been playing on the shared clock
+        if self.is_attacking and not self.is_powering:
+            frame = self.animator.frame("attack", self.attack_start)
+            if frame is None:
+                #finish animation for attack, back to idle
+                self.is_attacking = False
+                frame = 0
+            self.texture_set = "attack"
+            self.texture_index = frame
+
+        elif self.is_jumping:
+            # Plays through once then freezes on the last frame until the jump is over
+            self.texture_set = "jump"
+            self.texture_index = self.animator.frame("jump", self.jump_start)
+        else:
+            # Return to idle (first frame)
+            self.texture_set = "attack"
+            self.texture_index = 0
+
+#Friend drone that carries the player around, it jumps the opposite way during a powerup
+class Friend(Body):
+    """Friendly drone that follows the player's x and mirrors the powerup jump downwards"""
+
+    def __init__(self, x, y, timers):
+        super().__init__(hit_box("Friendly_Drone.png", PLAYER_SCALE))
+        self.place(x, y)
+        self.timers = timers
+        self.change_y = 0
+        self.change_x = 0
+        self.jump_state = JumpState.NOT_JUMPING
+        self.hold_timer = None
+        self.original_y = y
+
+    def end_hold(self):
+        """Hold timer callback, time to head back up"""
+        self.jump_state = JumpState.RETURNING_TO_ORIGINAL
+
+    def update(self, delta_time, player):
+        """Move the friend, player is the Player it follows"""
+        frames = delta_time * BASE_FRAME_RATE
+        # Handle jump movement states (opposite direction of player)
+        if self.jump_state == JumpState.MOVING_TO_POSITION:
+            # Move downward (opposite of player)
+            self.center_y -= JUMPING_SPEED * frames
+
+            # check if reached bottom of screen
+            if self.center_y <= self.height // 2:
+                self.center_y = self.height // 2
+                # Stay at position for duration, at the very bottom :>
+                self.jump_state = JumpState.HOLDING_AT_POSITION
+                self.hold_timer = self.timers.schedule(HOLD_AT_POSITION_DURATION, self.end_hold)
+
+        elif self.jump_state == JumpState.RETURNING_TO_ORIGINAL:
+            #Move back to original position
+            if self.center_y < self.original_y:
+                self.center_y += JUMPING_SPEED * frames
+
+                # Check if reached original position
+                if self.center_y >= self.original_y:
+                    self.center_y = self.original_y
+                    self.jump_state = JumpState.NOT_JUMPING
+
+        #Normal movement when not jumping
+        if self.jump_state == JumpState.NOT_JUMPING:
+            self.center_y += self.change_y * frames
+
+        # Always follow player's x position
+        self.center_x = player.center_x
+
+        #keep within bounds
+        if self.jump_state == JumpState.NOT_JUMPING:
+            if self.center_y < self.height // 2:
+                self.center_y = self.height // 2
+            elif self.center_y > SCREEN_HEIGHT - self.height // 2 - 50:
+                self.center_y = SCREEN_HEIGHT - self.height // 2 - 50
+
+#Bullet class ~
+class Bullet(Body):
+    """Bullet fired by the player"""
+    kind = "bullet"
+
+    def __init__(self, x=0, y=0, speed=Bullet_speed):
+        super().__init__(hit_box("Bullet.png"))
+        self.reset(x, y, speed)
+
+    def reset(self, x, y, speed):
+        """Reuse this bullet from a new position"""
+        self.place(x, y)
+        self.speed = speed
+        self.expiry = None  # Timer for when it leaves the screen
+
+    def time_to_leave(self):
+        """Seconds until the bullet is fully off the left edge, it never changes speed so this is exact"""
+        return (self.center_x + self.width) / (self.speed * BASE_FRAME_RATE)
+
+    def update(self, delta_time=0):
+        """Move the bullet to the left (negative x direction)"""
+        self.center_x -= self.speed * delta_time * BASE_FRAME_RATE
+
+#The whole game, minus the drawing
+class GameSimulation:
+    """Game state and rules, advanced with step(dt, inputs)"""
+
+    def __init__(self, seed=None, waves=WAVES_PATH, particle_cap=PARTICLE_CAP):
+        """
+        seed makes the run repeatable, every random choice comes from self.rng
+        (without one a seed is picked and kept in self.seed so the run can still be replayed).
+        waves is a wave file path or a WavePlan, particle_cap is the most explosion particles alive at once
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Game state
+        self.current_state = GameState.START_SCREEN
+        # What's held down, movement is read off this at the start of every step
+        self.controls = ControlState()
+
+        # Enemy waves, compiled into a spawn timeline at the start of each round
+        self.wave_plan = waves if isinstance(waves, WavePlan) else WavePlan.load(waves)
+
+        # Tunables
+        self.bullet_cooldown_time = BULLET_COOLDOWN_TIME
+        self.power_cooldown_time = POWER_COOLDOWN_TIME
+        self.powerup_destruction_time = POWERUP_ENEMY_DESTRUCTION_TIME
+
+        # Every animation runs off this one clock: the drone loop, the attack clip and the jump-and-hold clip
+        self.animator = Animator((
+            Clip("drone", DRONE_FRAMES, ENEMY_ANIMATION_SPEED, ClipMode.LOOP),
+            Clip("attack", PLAYER_ATTACK_FRAMES, ATTACK_ANIMATION_SPEED, ClipMode.ONCE),
+            Clip("jump", PLAYER_JUMP_FRAMES, JUMP_ANIMATION_SPEED, ClipMode.HOLD),
+        ))
+
+        # Live entities, the enemies are kept as NumPy arrays so big waves update in one go
+        drone_sizes = {
+            number: hit_box(f"Enemy_Drone_{number}.png", ENEMY_SCALE, square_frame=True)
+            for number in range(1, DRONE_TYPES + 1)
+        }
+        self.enemies = EnemyStore(drone_sizes, self.animator.clip("drone"), pool_size=ENEMY_POOL_SIZE)
+        self.bullets = EntityRegistry()
+        # Explosions are particle bursts, all of them in one set of arrays
+        self.particles = ParticleSystem(particle_cap)
+
+        # Pool that recycles bullets between shots (the enemy store pools its own handles)
+        self.bullet_pool = ObjectPool(Bullet, BULLET_POOL_SIZE)
+        self.bullet_pool.prefill()
+
+        # Every countdown and despawn time, only the ones that are due get touched each step
+        self.timers = TimerService()
+
+        # Kills and damage found during a step, applied together at the end of it
+        self.events = EventQueue()
+        self.events.subscribe(KILL, self.explode_kills)
+        self.events.subscribe(KILL, self.score_kills)
+        self.events.subscribe(KILL, self.remove_enemies)
+        self.events.subscribe(WIPE, self.wipe_enemies)
+        self.events.subscribe(DAMAGE, self.lose_health)
+
+        # Per phase timings, off until something (the window's F3 key) turns it on
+        self.profiler = FrameProfiler()
+
+        # Whoever wants to hear about entities coming and going (the window uses this to manage sprites)
+        self.listeners = []
+
+        self.setup()
+
+    def add_listener(self, listener):
+        """
+        listener may define entity_added(entity) and entity_removed(entity), plus enemies_removed(enemies)
+        for a step's worth of dead drones and enemies_cleared(enemies) for when every enemy goes at once
+        (without those, it gets an entity_removed per enemy instead)
+        """
+        self.listeners.append(listener)
+
+    def _emit(self, event, entity):
+        for listener in self.listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(entity)
+
+    def setup(self):
+        """Set up (or restart) a round"""
+        # Hand everything from the last round back to the pools
+        self.clear_enemies()
+        for bullet in self.bullets.snapshot():
+            self.remove_bullet(bullet)
+        # Particles get their own random numbers, restarted every round so replays match
+        self.particles.reset(self.seed)
+        # Nothing from the last round is allowed to go off in this one
+        self.timers.clear()
+        self.events.clear()
+
+        # Reset score, health and cooldowns
+        self.score = 0
+        self.health = PLAYER_MAX_HEALTH
+        self.bullet_timer = None
+        self.power_timer = None
+
+        # Player and the friend drone that carries them
+        self.player = Player(PLAYER_X, PLAYER_INITIAL_Y, self.animator, self.timers)
+        self.friend = Friend(PLAYER_X, PLAYER_INITIAL_Y - 50, self.timers)
+
+        # Enemy spawning, the waves start over every round
+        self.waves = WaveScheduler(self.wave_plan, self.rng, ENEMY_LANES, list(range(1, DRONE_TYPES + 1)))
+
+        # Leftover frame time that hasn't made up a whole fixed step yet
+        self.accumulator = 0
+
+    @property
+    def bullet_cooldown(self):
+        """Seconds until the player can shoot again, 0 when they can"""
+        return self.timers.remaining(self.bullet_timer)
+
+    @property
+    def power_cooldown(self):
+        """Seconds until the powerup can be used again, 0 when it can"""
+        return self.timers.remaining(self.power_timer)
+
+    def pool_stats(self):
+        """Usage stats for every entity pool"""
+        return {
+            "enemy": self.enemies.pool.stats(),
+            "bullet": self.bullet_pool.stats(),
+        }
+
+    def state_hash(self):
+        """Short digest of everything that matters about the game right now, for spotting replay divergence"""
+        player = self.player
+        friend = self.friend
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(repr((
+            self.current_state.value, self.score, self.health,
+            self.bullet_cooldown, self.power_cooldown, self.waves.time, self.waves.cursor,
+            player.center_x, player.center_y, player.jump_state.value, player.texture_set, player.texture_index,
+            friend.center_x, friend.center_y,
+            [(bullet.center_x, bullet.center_y) for bullet in self.bullets],
+        )).encode())
+        enemies = self.enemies
+        n = len(enemies)
+        for column in (enemies.x, enemies.y, enemies.frame, enemies.drone_type, enemies.health):
+            digest.update(column[:n].tobytes())
+        particles = self.particles
+        digest.update(particles.x[:particles.count].tobytes())
+        return digest.hexdigest()
+
+    #adding and removing entities
+    def _add(self, registry, entity):
+        registry.add(entity)
+        self._emit("entity_added", entity)
+
+    def _remove(self, registry, pool, entity):
+        registry.remove(entity)
+        self._emit("entity_removed", entity)
+        pool.release(entity)
+
+    def spawn_enemy(self, y_position=None, drone_number=None, speed=1, x_position=-30):
+        """
+        Spawn a new enemy, on a random lane and of a random type unless they're given.
+        Drones can't be moved after this (their despawn time is worked out here), so pass x_position instead.
+        speed has to be above 0, the breach timer is the only way a drone leaves the game
+        """
+        if speed <= 0:
+            raise ValueError("drones need a speed above 0 to ever leave the screen")
+        if y_position is None:
+            y_position = self.rng.choice(ENEMY_LANES)
+        if drone_number is None:
+            drone_number = self.rng.randint(1, DRONE_TYPES)
+        # Create enemy at x = -30 by default, moving right so that it looks smooth
+        anim_start = 0.0 if SYNC_DRONE_ANIMATION else self.animator.time
+        enemy = self.enemies.spawn(x_position, y_position, drone_number, speed=speed, health=ENEMY_HEALTH,
+                                   anim_start=anim_start)
+        # Drones fly straight at a constant speed, so when one reaches the right edge is known right now
+        distance = SCREEN_WIDTH - enemy.right
+        enemy.expiry = self.timers.schedule(distance / (speed * BASE_FRAME_RATE), self.enemy_breached, enemy)
+        self._emit("entity_added", enemy)
+        return enemy
+
+    def shoot_bullet(self):
+        """Create and fire a bullet from the player's position"""
+        bullet = self.bullet_pool.acquire(self.player.center_x, self.player.center_y, Bullet_speed)
+        bullet.expiry = self.timers.schedule(bullet.time_to_leave(), self.remove_bullet, bullet)
+        self._add(self.bullets, bullet)
+        return bullet
+
+    def create_explosions(self, xs, ys):
+        """Explosions at every (x, y) in one go, when there are too many the cap thins them out evenly"""
+        self.particles.emit(xs, ys)
+
+    def remove_enemies(self, enemies, causes=None):
+        """Take a step's dead enemies out in one pass (a kill subscriber), all of them at once is a clear"""
+        if len(enemies) == len(self.enemies):
+            self.clear_enemies()
+            return
+        for enemy in enemies:
+            if enemy.expiry is not None:
+                enemy.expiry.cancel()
+        for listener in self.listeners:
+            handler = getattr(listener, "enemies_removed", None)
+            if handler is not None:
+                handler(enemies)
+            elif hasattr(listener, "entity_removed"):
+                for enemy in enemies:
+                    listener.entity_removed(enemy)
+        self.enemies.remove_many(enemies)
+
+    def clear_enemies(self):
+        """Take every enemy out of the game in one go, returns (xs, ys) arrays of where they were"""
+        enemies = self.enemies.handles
+        for enemy in enemies:
+            if enemy.expiry is not None:
+                enemy.expiry.cancel()
+        for listener in self.listeners:
+            handler = getattr(listener, "enemies_cleared", None)
+            if handler is not None:
+                handler(enemies)
+            elif hasattr(listener, "entity_removed"):
+                for enemy in enemies:
+                    listener.entity_removed(enemy)
+        return self.enemies.clear()
+
+    def remove_bullet(self, bullet):
+        """Take a bullet out of the game and give it back to the pool"""
+        bullet.expiry.cancel()
+        self._remove(self.bullets, self.bullet_pool, bullet)
+
+    #timer callbacks
+    def enemy_breached(self, enemy):
+        """A drone made it to the right side, it blows up and costs a heart"""
+        if self.events.kill(enemy, BREACHED):
+            self.events.hurt(BREACHED)
+
+    def powerup_wipe(self):
+        """powerup_destruction_time into a powerup every drone on screen gets destroyed"""
+        self.events.kill_all(WIPED)
+
+    #event subscribers, each gets the whole step's kills or damage at once
+    def explode_kills(self, enemies, causes):
+        """One particle emit for every drone that died this step"""
+        rows = [enemy.slot for enemy in enemies]
+        self.create_explosions(self.enemies.x[rows], self.enemies.y[rows])
+
+    def score_kills(self, enemies, causes):
+        """Points for the kills the player earned"""
+        self.score += POINTS_PER_KILL * sum(cause in SCORING_CAUSES for cause in causes)
+
+    def wipe_enemies(self, cause):
+        """Every drone left dies at once, explosions where clear() says they were and points for each"""
+        xs, ys = self.clear_enemies()
+        self.create_explosions(xs, ys)
+        if cause in SCORING_CAUSES:
+            self.score += POINTS_PER_KILL * len(xs)
+
+    def lose_health(self, amount=1, causes=()):
+        """Take hearts away and end the game when they run out"""
+        self.health -= amount
+        if self.health <= 0:
+            self.current_state = GameState.GAME_OVER
+
+    #input
+    def press(self, action):
+        """Handle a control being pressed"""
+        # The table follows the keys on every screen, so a key held through a restart still counts
+        self.controls.press(action)
+        if self.current_state in (GameState.START_SCREEN, GameState.GAME_OVER):
+            #start game when its not started
+            if action == Action.SHOOT:
+                self.current_state = GameState.PLAYING
+                self.setup()
+            return
+
+        player = self.player
+        friend = self.friend
+        # Moving is handled by sample_controls(), presses only start things
+        #shoot
+        if action == Action.SHOOT:
+            # Only shoot if cooldown has expired and not powering up
+            if self.bullet_cooldown <= 0 and not player.is_powering:
+                # Trigger attack animation and shoot bullet
+                player.start_attack()
+                self.shoot_bullet()
+                self.bullet_timer = self.timers.schedule(self.bullet_cooldown_time)
+        #powerup
+        elif action == Action.POWER:
+            if self.power_cooldown <= 0:
+                # Trigger power animation and sync friend's jump state, a fresh powerup gets its wipe scheduled
+                if player.start_power():
+                    self.timers.schedule(self.powerup_destruction_time, self.powerup_wipe)
+                friend.jump_state = JumpState.MOVING_TO_POSITION
+                friend.original_y = friend.center_y
+                self.power_timer = self.timers.schedule(self.power_cooldown_time)
+
+    def release(self, action):
+        """Handle a control being let go"""
+        self.controls.release(action)
+
+    def sample_controls(self):
+        """Set the player's and friend's movement from whatever is held down right now"""
+        controls = self.controls
+        change_x = controls.axis(Action.LEFT, Action.RIGHT) * PLAYER_HORIZONTAL_SPEED
+        change_y = controls.axis(Action.DOWN, Action.UP) * PLAYER_MOVEMENT_SPEED
+        # Up/down only moves them when they're not in the powerup jump, Player.update sees to that
+        self.player.change_x = self.friend.change_x = change_x
+        self.player.change_y = self.friend.change_y = change_y
+
+    #fixed timestep loop
+    def advance(self, frame_time, inputs=()):
+        """
+        Run however many FIXED_TIMESTEP steps fit in frame_time (plus what was left over last time).
+        Returns (steps run, how far we are into the next step from 0 to 1), the window uses the second
+        one to interpolate positions. inputs are only used if a step actually runs, so on a very fast
+        frame with no step the caller should keep them for next time
+        """
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= FIXED_TIMESTEP:
+            self.step(FIXED_TIMESTEP, inputs)
+            inputs = ()
+            self.accumulator -= FIXED_TIMESTEP
+            steps += 1
+            if steps >= MAX_CATCH_UP_STEPS:
+                # Too far behind (a hitch or a slow machine), drop the rest instead of spiralling
+                self.accumulator = 0
+                break
+        return steps, self.accumulator / FIXED_TIMESTEP
+
+    def remember_positions(self):
+        """Save where everything is before it moves, for render interpolation"""
+        self.enemies.remember_positions()
+        for bullet in self.bullets:
+            bullet.remember_position()
+        self.player.remember_position()
+        self.friend.remember_position()
+
+    #the main update
+    def step(self, delta_time, inputs=()):
+        """
+        Advance the game by delta_time seconds. inputs is a sequence of (Action, pressed) events
+        that happened since the last step, applied in order before anything moves
+        """
+        self.remember_positions()
+        self.animator.tick(delta_time)
+        for action, pressed in inputs:
+            if pressed:
+                self.press(action)
+            else:
+                self.release(action)
+
+        if self.current_state != GameState.PLAYING:
+            return
+        phase = self.profiler.phase
+        # Movement comes from the held controls as they are at the start of the step
+        self.sample_controls()
+
+        # Cooldowns, the powerup hold and wipe, and bullets/drones leaving the screen, only what's due is touched
+        with phase("timers"):
+            self.timers.update(delta_time)
+
+        # Spawn whatever the waves have due, big bursts get spread over a few steps by the spawn budget
+        with phase("spawn"):
+            for y_position, drone_number, speed in self.waves.update(delta_time):
+                self.spawn_enemy(y_position, drone_number, speed)
+
+        # Update bullets
+        with phase("bullet update"):
+            for bullet in self.bullets:
+                bullet.update(delta_time)
+
+        # Move the explosion particles and let the burnt out ones go
+        with phase("particles"):
+            self.particles.step(delta_time)
+
+        # Update enemies, all of them at once
+        with phase("enemy update"):
+            self.enemies.step(delta_time * BASE_FRAME_RATE)
+            self.enemies.animate(self.animator.time)
+
+        # Check for bullet-enemy collisions, the drone hit boxes are worked out once for every bullet and
+        # the player, each bullet hits the first drone it touches that isn't already dead this step
+        # (kills wait for the flush below, so nothing moves or leaves the store while the index is in use)
+        events = self.events
+        with phase("bullet collisions"):
+            index = self.enemies.collision_index(len(self.bullets) + 1)
+            handles = self.enemies.handles
+            for bullet in self.bullets.snapshot():
+                rows = index.query(bullet.left, bullet.bottom, bullet.right, bullet.top)
+                for row in rows:
+                    enemy = handles[row]
+                    if events.doomed(enemy):
+                        continue
+                    # Remove the bullet, and the enemy once it runs out of health
+                    self.remove_bullet(bullet)
+                    enemy.health -= 1
+                    if enemy.health <= 0:
+                        events.kill(enemy, SHOT)
+                    break
+
+        # Check for player-enemy collisions (only if not powering up), every drone touching the player counts
+        with phase("player collisions"):
+            if not self.player.is_powering:
+                player = self.player
+                for row in index.query(player.left, player.bottom, player.right, player.top):
+                    if events.kill(handles[row], RAMMED):
+                        events.hurt(RAMMED)
+
+        # Everything that died or got hurt this step: explosions, score, removals and hearts all in one go
+        with phase("events"):
+            events.flush()
+
+        # Update player with delta_time for animation
+        with phase("player update"):
+            self.player.update(delta_time)
+        with phase("friend update"):
+            self.friend.update(delta_time, self.player)
@@ -0,0 +1,67 @@
+# STARTUP PIPELINE
+# Gets the start screen up first and loads everything gameplay needs on worker threads behind it.
+# It also times the two numbers the kiosks care about: time to first frame and time to playable
+# (both counted from when the game module started importing)
+from concurrent.futures import ThreadPoolExecutor, wait
+import json
+import time
+
+# Threads decoding gameplay assets while the start screen is up
+STARTUP_WORKERS = 4
+
+
+#Background loading plus the startup clock
+class StartupPipeline:
+    """Runs loading jobs on a thread pool and records when the first frame and the playable game happened"""
+
+    def __init__(self, launched, workers=STARTUP_WORKERS):
+        """launched is the time.perf_counter() reading the startup times are measured from"""
+        self.launched = launched
+        self.workers = workers
+        self.executor = None
+        self.jobs = []
+        self.first_frame_time = None
+        self.playable_time = None
+
+    def start(self, jobs):
+        """Kick off every job (a callable taking no arguments) in the background"""
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="preload")
+        self.jobs = [self.executor.submit(job) for job in jobs]
+
+    @property
+    def ready(self):
+        """True once every background job has finished, doesn't block"""
+        return all(job.done() for job in self.jobs)
+
+    def wait(self):
+        """Block until the background jobs are done, re-raising the first one that failed"""
+        wait(self.jobs)
+        for job in self.jobs:
+            job.result()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def first_frame(self):
+        """Call after each frame is drawn, only the first one counts"""
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - self.launched
+
+    def playable(self):
+        """Call once the game can be started without any more loading"""
+        if self.playable_time is None:
+            self.playable_time = time.perf_counter() - self.launched
+
+    def report(self):
+        """The startup times in seconds as a dict"""
+        return {
+            "time_to_first_frame": self.first_frame_time,
+            "time_to_playable": self.playable_time,
+            "preload_jobs": len(self.jobs),
+            "workers": self.workers,
+        }
+
+    def save_report(self, path):
+        """Write report() to path as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
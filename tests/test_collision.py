@@ -0,0 +1,46 @@
+# The sort and sweep index has to find exactly what the brute force scan does
+import numpy as np
+import pytest
+
+from collision import SWEEP_MIN_QUERIES, ScanIndex, SweepIndex, collision_index
+
+
+def random_bounds(rng, count):
+    lefts = rng.uniform(-50, 800, count)
+    bottoms = rng.uniform(0, 600, count)
+    # Mixed widths, the sweep has to look back far enough for the widest box
+    widths = rng.choice([5.0, 20.0, 120.0], count)
+    heights = rng.uniform(5, 60, count)
+    return lefts, bottoms, lefts + widths, bottoms + heights
+
+
+@pytest.mark.parametrize("count", [0, 1, 7, 300, 5000])
+def test_sweep_matches_scan(count):
+    rng = np.random.default_rng(count)
+    bounds = random_bounds(rng, count)
+    scan = ScanIndex(bounds)
+    sweep = SweepIndex(bounds)
+    for _ in range(200):
+        left = rng.uniform(-100, 850)
+        bottom = rng.uniform(-20, 620)
+        box = (left, bottom, left + rng.uniform(0, 40), bottom + rng.uniform(0, 40))
+        assert list(sweep.query(*box)) == list(scan.query(*box))
+
+
+def test_touching_edges_count_as_hits():
+    bounds = (np.array([0.0, 10.0]), np.array([0.0, 0.0]), np.array([10.0, 20.0]), np.array([10.0, 10.0]))
+    for index in (ScanIndex(bounds), SweepIndex(bounds)):
+        assert list(index.query(10, 10, 10, 10)) == [0, 1]
+        assert list(index.query(20.5, 0, 30, 10)) == []
+
+
+def test_duplicate_left_edges_come_back_lowest_first():
+    lefts = np.array([5.0, 0.0, 5.0, 5.0])
+    bounds = (lefts, np.zeros(4), lefts + 10, np.full(4, 10.0))
+    assert list(SweepIndex(bounds).query(6, 1, 7, 2)) == [0, 1, 2, 3]
+
+
+def test_collision_index_sorts_only_for_many_queries():
+    bounds = random_bounds(np.random.default_rng(0), 10)
+    assert isinstance(collision_index(bounds, 1), ScanIndex)
+    assert isinstance(collision_index(bounds, SWEEP_MIN_QUERIES), SweepIndex)
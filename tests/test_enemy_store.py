@@ -0,0 +1,77 @@
+# The enemy store's arrays and handles have to stay in step however drones leave
+import numpy as np
+import pytest
+
+from animation import Clip
+from enemy_store import COMPACT_FRACTION, EnemyStore
+
+SIZES = {1: (20, 10, (-10, -5, 10, 5)), 2: (40, 20, (-20, -10, 20, 10))}
+
+
+def make_store(count):
+    store = EnemyStore(SIZES, Clip("drone", 4, 0.1), capacity=4, pool_size=4)
+    enemies = [store.spawn(float(i), float(i * 2), 1 + i % 2, speed=1 + i) for i in range(count)]
+    return store, enemies
+
+
+def assert_consistent(store, expected):
+    """Every live handle points at its own row, and the rows hold that drone's data"""
+    assert len(store) == len(expected)
+    assert sorted(id(enemy) for enemy in store) == sorted(id(enemy) for enemy in expected)
+    for row, enemy in enumerate(store.handles):
+        assert enemy.slot == row
+        assert enemy.store is store
+    for enemy, (x, y, number) in expected.items():
+        assert (enemy.center_x, enemy.center_y, int(store.drone_type[enemy.slot])) == (x, y, number)
+
+
+def snapshot(enemies):
+    return {enemy: (enemy.center_x, enemy.center_y, enemy.drone_number) for enemy in enemies}
+
+
+def test_spawn_grows_past_capacity():
+    store, enemies = make_store(10)
+    assert store.capacity >= 10
+    assert_consistent(store, snapshot(enemies))
+
+
+@pytest.mark.parametrize("removed", [
+    [0],  # few, swapped out one by one
+    [3, 9, 4],
+    list(range(0, 40, 2)),  # enough to pack the arrays in one pass
+    list(range(40)),
+])
+def test_remove_many_keeps_the_rest(removed):
+    store, enemies = make_store(40)
+    expected = snapshot(enemies)
+    gone = [enemies[i] for i in removed]
+    for enemy in gone:
+        del expected[enemy]
+    store.remove_many(gone)
+    assert_consistent(store, expected)
+    assert all(enemy.store is None and enemy.slot is None for enemy in gone)
+
+
+def test_remove_many_packs_in_order_past_the_threshold():
+    store, enemies = make_store(16)
+    gone = enemies[:16 // COMPACT_FRACTION + 1]
+    store.remove_many(gone)
+    assert store.handles == enemies[len(gone):]
+
+
+def test_clear_returns_positions_and_empties_the_store():
+    store, enemies = make_store(12)
+    xs, ys = store.clear()
+    assert xs.tolist() == [float(i) for i in range(12)]
+    assert ys.tolist() == [float(i * 2) for i in range(12)]
+    assert len(store) == 0 and store.handles == []
+    assert all(enemy.store is None for enemy in enemies)
+    # The store fills up from the front again afterwards
+    assert store.spawn(1.0, 1.0, 1, 1).slot == 0
+
+
+def test_bounds_follow_the_hit_boxes():
+    store, _ = make_store(2)
+    lefts, bottoms, rights, tops = store.bounds()
+    assert np.allclose(lefts, [-10, -19]) and np.allclose(rights, [10, 21])
+    assert np.allclose(bottoms, [-5, -8]) and np.allclose(tops, [5, 12])
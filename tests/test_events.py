@@ -0,0 +1,83 @@
+# Kills and damage queue up over a step and go out in one batch per subscriber on flush()
+from events import BREACHED, DAMAGE, KILL, RAMMED, SHOT, WIPE, WIPED, EventQueue
+
+
+class Recorder:
+    """Subscribes to every kind and keeps what each flush handed over"""
+
+    def __init__(self, queue):
+        self.calls = []
+        queue.subscribe(KILL, lambda enemies, causes: self.calls.append((KILL, list(enemies), list(causes))))
+        queue.subscribe(WIPE, lambda cause: self.calls.append((WIPE, cause)))
+        queue.subscribe(DAMAGE, lambda amount, causes: self.calls.append((DAMAGE, amount, list(causes))))
+
+
+def test_nothing_goes_out_until_flush():
+    queue = EventQueue()
+    recorder = Recorder(queue)
+    queue.kill("a", SHOT)
+    queue.hurt(RAMMED)
+    assert recorder.calls == []
+    queue.flush()
+    assert recorder.calls == [(KILL, ["a"], [SHOT]), (DAMAGE, 1, [RAMMED])]
+    queue.flush()
+    assert len(recorder.calls) == 2
+
+
+def test_a_drone_only_dies_once_and_the_first_cause_wins():
+    queue = EventQueue()
+    recorder = Recorder(queue)
+    assert queue.kill("a", SHOT)
+    assert queue.doomed("a") and not queue.doomed("b")
+    assert not queue.kill("a", BREACHED)
+    assert queue.kill("b", RAMMED)
+    queue.flush()
+    assert recorder.calls == [(KILL, ["a", "b"], [SHOT, RAMMED])]
+    assert queue.stats() == {"kills": 2, "wipes": 0, "duplicates": 1}
+
+
+def test_damage_adds_up_over_the_step():
+    queue = EventQueue()
+    recorder = Recorder(queue)
+    queue.hurt(BREACHED)
+    queue.hurt(RAMMED, 2)
+    queue.flush()
+    assert recorder.calls == [(DAMAGE, 3, [BREACHED, RAMMED, RAMMED])]
+
+
+def test_subscribers_run_in_the_order_they_subscribed():
+    queue = EventQueue()
+    order = []
+    queue.subscribe(KILL, lambda enemies, causes: order.append("first"))
+    queue.subscribe(KILL, lambda enemies, causes: order.append("second"))
+    queue.kill("a", SHOT)
+    queue.flush()
+    assert order == ["first", "second"]
+
+
+def test_kill_all_is_one_event_after_the_earlier_kills():
+    queue = EventQueue()
+    recorder = Recorder(queue)
+    queue.kill("a", BREACHED)
+    queue.hurt(BREACHED)
+    queue.kill_all(WIPED)
+    # Everything is doomed once the wipe is queued, later kills don't count again
+    assert queue.doomed("b")
+    assert not queue.kill("b", SHOT)
+    queue.kill_all(SHOT)
+    queue.flush()
+    assert recorder.calls == [(KILL, ["a"], [BREACHED]), (WIPE, WIPED), (DAMAGE, 1, [BREACHED])]
+    assert queue.stats()["wipes"] == 1
+    assert not queue.doomed("b")
+
+
+def test_clear_drops_everything_quietly():
+    queue = EventQueue()
+    recorder = Recorder(queue)
+    queue.kill("a", SHOT)
+    queue.kill_all(WIPED)
+    queue.hurt(RAMMED)
+    queue.clear()
+    queue.flush()
+    assert recorder.calls == []
+    assert not queue.doomed("a")
@@ -0,0 +1,81 @@
+# Timers go off in due order, once, and cancelled ones never do
+from timers import COMPACT_MIN, TimerService
+
+
+def test_timers_fire_in_due_order_then_creation_order():
+    timers = TimerService()
+    fired = []
+    timers.schedule(0.3, fired.append, "late")
+    timers.schedule(0.1, fired.append, "first")
+    timers.schedule(0.1, fired.append, "second")
+    timers.update(0.05)
+    assert fired == []
+    timers.update(0.05)
+    assert fired == ["first", "second"]
+    timers.update(1.0)
+    assert fired == ["first", "second", "late"]
+    timers.update(1.0)
+    assert len(fired) == 3 and len(timers) == 0
+
+
+def test_cancelled_timers_never_fire():
+    timers = TimerService()
+    fired = []
+    timer = timers.schedule(0.1, fired.append, "cancelled")
+    timers.schedule(0.2, fired.append, "kept")
+    timer.cancel()
+    timer.cancel()
+    assert len(timers) == 1
+    timers.update(1.0)
+    assert fired == ["kept"]
+    assert timers.stats() == {"pending": 0, "cancelled": 0, "fired": 1}
+
+
+def test_remaining_counts_down_to_zero():
+    timers = TimerService()
+    countdown = timers.schedule(1.0)
+    timers.update(0.25)
+    assert countdown.remaining == 0.75
+    assert timers.remaining(countdown) == 0.75
+    assert timers.remaining(None) == 0.0
+    timers.update(1.0)
+    assert countdown.remaining == 0.0 and not countdown.active
+
+
+def test_a_callback_can_cancel_and_schedule_other_timers():
+    timers = TimerService()
+    fired = []
+    later = timers.schedule(0.2, fired.append, "cancelled")
+
+    def first():
+        fired.append("first")
+        later.cancel()
+        timers.schedule(0.0, fired.append, "scheduled")
+
+    timers.schedule(0.1, first)
+    timers.update(0.5)
+    assert fired == ["first", "scheduled"]
+
+
+def test_mass_cancels_compact_the_heap_without_losing_live_timers():
+    timers = TimerService()
+    fired = []
+    doomed = [timers.schedule(1.0 + i, fired.append, i) for i in range(COMPACT_MIN * 2)]
+    kept = timers.schedule(0.5, fired.append, "kept")
+    for timer in doomed:
+        timer.cancel()
+    assert len(timers.heap) < COMPACT_MIN * 2
+    assert len(timers) == 1 and kept.active
+    timers.update(1000.0)
+    assert fired == ["kept"]
+
+
+def test_clear_drops_every_timer_and_resets_the_clock():
+    timers = TimerService()
+    fired = []
+    timer = timers.schedule(0.1, fired.append, "dropped")
+    timers.update(0.05)
+    timers.clear()
+    assert timers.time == 0.0 and len(timers) == 0 and not timer.active
+    timers.update(1.0)
+    assert fired == []
@@ -0,0 +1,82 @@
+# Wave file validation: bad files fail at load time with the path and the wave in the message
+import json
+import pathlib
+
+import pytest
+
+from waves import DRONE_TYPES, Wave, WavePlan
+
+
+def write_waves(tmp_path, *waves, **plan):
+    path = tmp_path / "waves.json"
+    path.write_text(json.dumps({"waves": list(waves), **plan}))
+    return path
+
+
+def test_default_wave_file_loads(monkeypatch):
+    # WAVES_PATH is relative to the repo root, where the game runs from
+    monkeypatch.chdir(pathlib.Path(__file__).resolve().parent.parent)
+    plan = WavePlan.load()
+    assert plan.waves
+    assert all(wave.speed > 0 for wave in plan.waves)
+
+
+def test_good_wave_loads(tmp_path):
+    path = write_waves(tmp_path, {"name": "opener", "count": 3, "delay": 1, "interval": 0.5,
+                                  "lanes": [100, 200.5], "drone_types": [1, DRONE_TYPES], "speed": 1.5})
+    wave, = WavePlan.load(path).waves
+    assert (wave.count, wave.delay, wave.interval, wave.speed) == (3, 1, 0.5, 1.5)
+    assert wave.duration == 1.0
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("count", 2.5, "count must be a whole number"),
+    ("count", "3", "count must be a whole number"),
+    ("count", True, "count must be a whole number"),
+    ("count", -1, "count can't be negative"),
+    ("delay", -1, "delay and interval must be numbers, 0 or more"),
+    ("delay", "soon", "delay and interval must be numbers, 0 or more"),
+    ("interval", None, "delay and interval must be numbers, 0 or more"),
+    ("interval", -0.5, "delay and interval must be numbers, 0 or more"),
+    ("speed", "fast", "speed must be a number above 0"),
+    ("speed", 0, "speed must be a number above 0"),
+    ("speed", -1, "speed must be a number above 0"),
+    ("speed", None, "speed must be a number above 0"),
+    ("lanes", [], "lanes must be a non-empty list of numbers"),
+    ("lanes", 100, "lanes must be a non-empty list of numbers"),
+    ("lanes", [100, "top"], "lanes must be a non-empty list of numbers"),
+    ("drone_types", [], "drone_types must be a non-empty list"),
+    ("drone_types", [0], "drone_types must be a non-empty list"),
+    ("drone_types", [DRONE_TYPES + 1], "drone_types must be a non-empty list"),
+    ("drone_types", [1.0], "drone_types must be a non-empty list"),
+])
+def test_bad_wave_is_rejected_with_path(tmp_path, field, value, message):
+    path = write_waves(tmp_path, {"name": "fine"}, {"name": "broken", field: value})
+    with pytest.raises(ValueError) as error:
+        WavePlan.load(path)
+    assert str(error.value).startswith(f"{path}: wave 1 (broken): ")
+    assert message in str(error.value)
+
+
+def test_unknown_field_is_rejected_with_path(tmp_path):
+    path = write_waves(tmp_path, {"name": "typo", "cuont": 3})
+    with pytest.raises(ValueError, match="cuont") as error:
+        WavePlan.load(path)
+    assert str(error.value).startswith(f"{path}: wave 0: ")
+
+
+@pytest.mark.parametrize("plan, message", [
+    ({"spawn_budget": 0}, "spawn_budget must be at least 1"),
+    ({"loop": True}, "a looping wave plan has to take some time"),
+])
+def test_bad_plan_is_rejected_with_path(tmp_path, plan, message):
+    path = write_waves(tmp_path, {"name": "instant"}, **plan)
+    with pytest.raises(ValueError, match=message) as error:
+        WavePlan.load(path)
+    assert str(error.value).startswith(f"{path}: ")
+
+
+@pytest.mark.parametrize("speed", [0, -1, "fast"])
+def test_waves_built_in_code_need_a_speed_above_zero(speed):
+    with pytest.raises(ValueError, match="speed must be a number above 0"):
+        Wave("tuned", count=1, speed=speed)
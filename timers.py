@@ -0,0 +1,99 @@
+# TIMERS
+# Every countdown in the game (shot and powerup cooldowns, the powerup hold, the wipe, when a bullet leaves
+# the screen or a drone reaches the right edge) is one entry in a heap ordered by when it's due. A step only
+# pops the timers that actually go off, so the per-step cost doesn't grow with how many are waiting
+# Cancelled timers are left in the heap and skipped when they come up, the heap gets rebuilt if they pile up
+import heapq
+import itertools
+
+# Rebuild the heap once more than half of it (and at least this many entries) are cancelled timers
+COMPACT_MIN = 64
+
+
+#One scheduled callback
+class Timer:
+    """A callback due at a point on the service's clock, cancel() stops it going off"""
+
+    def __init__(self, service, due, callback, args):
+        self.service = service
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+    def cancel(self):
+        """Stop the timer going off, does nothing if it already went off or was cancelled"""
+        self.service.cancel(self)
+
+    @property
+    def remaining(self):
+        """Seconds until it goes off, 0 once it has (or was cancelled)"""
+        if not self.active:
+            return 0.0
+        return max(self.due - self.service.time, 0.0)
+
+
+#The clock and the queue of everything waiting on it
+class TimerService:
+    """Heap of Timers on a clock that only moves when update(delta_time) is called"""
+
+    def __init__(self):
+        self.heap = []
+        self.time = 0.0
+        self.counter = itertools.count()  # keeps timers due at the same moment in the order they were made
+        self.cancelled = 0
+        self.fired = 0
+
+    def schedule(self, delay, callback=None, *args):
+        """Call callback(*args) delay seconds from now and return the Timer, no callback is a plain countdown"""
+        timer = Timer(self, self.time + delay, callback, args)
+        heapq.heappush(self.heap, (timer.due, next(self.counter), timer))
+        return timer
+
+    def cancel(self, timer):
+        """Stop a timer going off"""
+        if not timer.active:
+            return
+        timer.active = False
+        self.cancelled += 1
+        if self.cancelled >= COMPACT_MIN and self.cancelled * 2 > len(self.heap):
+            self.heap = [entry for entry in self.heap if entry[2].active]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    def remaining(self, timer):
+        """Seconds left on timer, 0 for None or a timer that's done"""
+        return 0.0 if timer is None else timer.remaining
+
+    def update(self, delta_time):
+        """Move the clock on and fire every timer that's now due, earliest first"""
+        self.time += delta_time
+        # self.heap is looked up every time round, a callback cancelling timers can rebuild it
+        while self.heap and self.heap[0][0] <= self.time:
+            timer = heapq.heappop(self.heap)[2]
+            if not timer.active:
+                self.cancelled -= 1
+                continue
+            timer.active = False
+            self.fired += 1
+            if timer.callback is not None:
+                timer.callback(*timer.args)
+
+    def clear(self):
+        """Drop every timer without firing it and start the clock from 0"""
+        for _, _, timer in self.heap:
+            timer.active = False
+        self.heap = []
+        self.time = 0.0
+        self.cancelled = 0
+
+    def stats(self):
+        """Queue counters for the benchmark"""
+        return {
+            "pending": len(self.heap) - self.cancelled,
+            "cancelled": self.cancelled,
+            "fired": self.fired,
+        }
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
@@ -0,0 +1,484 @@
+# VECTORIZED ENVIRONMENTS
+# Gym-style training API for bots: N independent games stepped in lockstep in one process. Every game's
+# state is a row in a set of NumPy arrays (drones and bullets are fixed size slots per game), so one step
+# for all N games is the same few dozen array operations whether N is 1 or 1000
+# The rules are GameSimulation's (speeds, hit boxes, cooldowns, the powerup jump and wipe, waves and the
+# spawn budget, hearts) written over arrays. The parts that can't change how a game goes are left out:
+# animation, the friend drone and explosion particles. It has its own random numbers, so a game here
+# won't replay the same as a GameSimulation with the same seed
+#   env = VectorGame(256, seed=0)
+#   obs, info = env.reset()
+#   obs, reward, terminated, truncated, info = env.step(actions)   # actions is a (256, 4) int array
+#   python vec_env.py --envs 256          how many game steps a second this machine gets
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from simulation import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    FIXED_TIMESTEP,
+    BASE_FRAME_RATE,
+    PLAYER_MOVEMENT_SPEED,
+    PLAYER_HORIZONTAL_SPEED,
+    PLAYER_X,
+    PLAYER_INITIAL_Y,
+    Bullet_speed,
+    JUMPING_SPEED,
+    HOLD_AT_POSITION_DURATION,
+    POWERUP_ENEMY_DESTRUCTION_TIME,
+    PLAYER_MAX_HEALTH,
+    POINTS_PER_KILL,
+    BULLET_COOLDOWN_TIME,
+    POWER_COOLDOWN_TIME,
+    DRONE_TYPES,
+    ENEMY_LANES,
+    ENEMY_HEALTH,
+    PLAYER_SCALE,
+    ENEMY_SCALE,
+    JumpState,
+    hit_box,
+)
+from waves import WAVES_PATH, WavePlan
+
+# Columns of an action row and what their values mean, the same controls as the keyboard
+ACTION_VERTICAL = 0  # 0 nothing, 1 up (W), 2 down (S)
+ACTION_HORIZONTAL = 1  # 0 nothing, 1 left (A), 2 right (D)
+ACTION_SHOOT = 2  # 1 presses SPACE
+ACTION_POWER = 3  # 1 presses E
+ACTION_SIZES = (3, 3, 2, 2)  # choices per column, a MultiDiscrete space
+
+# Observation row: player x, y, shot cooldown, powerup cooldown, powering, health (all 0 to 1),
+# then x, y, present for the OBSERVED_ENEMIES drones closest to the right edge
+OBSERVED_ENEMIES = 8
+OBSERVATION_SIZE = 6 + 3 * OBSERVED_ENEMIES
+
+# Fixed steps per env step, two 1/120 s steps is one 60 fps frame like the window plays at
+FRAME_SKIP = 2
+# Episodes still going after this long are cut off (truncated)
+MAX_EPISODE_SECONDS = 300
+
+# Reward: 1 per drone destroyed, minus this for every heart lost
+HEART_PENALTY = 5.0
+
+# Slots per game, a spawn with no free drone slot is dropped (and counted in info)
+MAX_ENEMIES = 64
+MAX_BULLETS = 4
+
+NOT_JUMPING = JumpState.NOT_JUMPING.value
+MOVING_TO_POSITION = JumpState.MOVING_TO_POSITION.value
+HOLDING_AT_POSITION = JumpState.HOLDING_AT_POSITION.value
+RETURNING_TO_ORIGINAL = JumpState.RETURNING_TO_ORIGINAL.value
+
+# action value -> player speed, for the two movement columns
+VERTICAL_SPEEDS = np.array([0, PLAYER_MOVEMENT_SPEED, -PLAYER_MOVEMENT_SPEED], np.float64)
+HORIZONTAL_SPEEDS = np.array([0, -PLAYER_HORIZONTAL_SPEED, PLAYER_HORIZONTAL_SPEED], np.float64)
+
+
+#The spawn timeline of a wave plan as arrays
+class SpawnTable:
+    """
+    One loop of a WavePlan with the lanes and drone types left as choices, every game reads the same
+    table with its own cursor and rolls its own lanes and types when a spawn comes due
+    """
+
+    def __init__(self, plan, lanes=ENEMY_LANES, drone_types=None):
+        drone_types = drone_types or list(range(1, DRONE_TYPES + 1))
+        times = []
+        speeds = []
+        lane_choices = []
+        type_choices = []
+        time = 0.0
+        for wave in plan.waves:
+            time += wave.delay
+            for i in range(wave.count):
+                times.append(time + i * wave.interval)
+                speeds.append(wave.speed)
+                lane_choices.append(wave.lanes or lanes)
+                type_choices.append(wave.drone_types or drone_types)
+            time += wave.duration
+
+        self.length = len(times)
+        self.loop = plan.loop and self.length > 0
+        self.duration = plan.duration
+        self.budget = plan.spawn_budget
+        # One extra entry that's never due, where a plan that doesn't loop parks once it runs out
+        self.times = np.array(times + [np.inf])
+        self.speeds = np.array(speeds + [0.0])
+        self.lanes, self.lane_counts = self._pad(lane_choices)
+        self.types, self.type_counts = self._pad(type_choices)
+
+    @staticmethod
+    def _pad(choices):
+        """List of lists -> (rows padded into a 2D array, how many are real in each row)"""
+        width = max((len(row) for row in choices), default=1)
+        table = np.zeros((len(choices) + 1, width), np.int64)
+        counts = np.ones(len(choices) + 1, np.int64)
+        for i, row in enumerate(choices):
+            table[i, :len(row)] = row
+            counts[i] = len(row)
+        return table, counts
+
+
+#N games at once
+class VectorGame:
+    """num_envs games in lockstep, reset() and step(actions) work like a Gym vector env"""
+
+    def __init__(self, num_envs, seed=None, waves=WAVES_PATH, max_enemies=MAX_ENEMIES, max_bullets=MAX_BULLETS,
+                 frame_skip=FRAME_SKIP, max_episode_seconds=MAX_EPISODE_SECONDS):
+        """
+        seed feeds the one rng every game rolls its spawns from, waves is a wave file path or a WavePlan.
+        Tunables (bullet_cooldown_time, power_cooldown_time, powerup_destruction_time, heart_penalty)
+        are plain attributes like on GameSimulation
+        """
+        self.num_envs = num_envs
+        self.frame_skip = frame_skip
+        self.max_episode_steps = round(max_episode_seconds / (FIXED_TIMESTEP * frame_skip))
+        self.spawns = SpawnTable(waves if isinstance(waves, WavePlan) else WavePlan.load(waves))
+
+        # Tunables
+        self.bullet_cooldown_time = BULLET_COOLDOWN_TIME
+        self.power_cooldown_time = POWER_COOLDOWN_TIME
+        self.powerup_destruction_time = POWERUP_ENEMY_DESTRUCTION_TIME
+        self.heart_penalty = HEART_PENALTY
+
+        # Sizes, measured from the images the same way the simulation does
+        width, height, self.player_box = hit_box("CA_0.png", PLAYER_SCALE)
+        self.y_min = height // 2 + 50
+        self.y_max = SCREEN_HEIGHT - height // 2
+        self.x_min = width // 2
+        self.x_max = SCREEN_WIDTH - width // 2
+        self.bullet_width, _, self.bullet_box = hit_box("Bullet.png")
+        # drone number -> hit box, row 0 is unused
+        self.drone_boxes = np.zeros((DRONE_TYPES + 1, 4))
+        for number in range(1, DRONE_TYPES + 1):
+            self.drone_boxes[number] = hit_box(f"Enemy_Drone_{number}.png", ENEMY_SCALE, square_frame=True)[2]
+
+        n = num_envs
+        # Player and round state, one row per game
+        self.player_x = np.zeros(n)
+        self.player_y = np.zeros(n)
+        self.change_x = np.zeros(n)
+        self.change_y = np.zeros(n)
+        self.jump_state = np.zeros(n, np.int8)
+        self.original_y = np.zeros(n)
+        self.powering = np.zeros(n, np.bool_)
+        # Countdowns in seconds, inf when nothing is waiting
+        self.hold_timer = np.zeros(n)
+        self.wipe_timer = np.zeros(n)
+        self.bullet_cooldown = np.zeros(n)
+        self.power_cooldown = np.zeros(n)
+        self.health = np.zeros(n, np.int64)
+        self.score = np.zeros(n, np.int64)
+        self.steps = np.zeros(n, np.int64)
+        # Waves
+        self.wave_time = np.zeros(n)
+        self.cycle_start = np.zeros(n)
+        self.cursor = np.zeros(n, np.int64)
+        # Drones, max_enemies slots per game
+        self.enemy_alive = np.zeros((n, max_enemies), np.bool_)
+        self.enemy_x = np.zeros((n, max_enemies))
+        self.enemy_y = np.zeros((n, max_enemies))
+        self.enemy_vx = np.zeros((n, max_enemies))
+        self.enemy_health = np.zeros((n, max_enemies), np.int64)
+        self.enemy_type = np.zeros((n, max_enemies), np.int64)
+        # hit box (left, bottom, right, top) relative to the centre, copied in from the drone type at spawn
+        self.enemy_box = np.zeros((4, n, max_enemies))
+        # Bullets, max_bullets slots per game
+        self.bullet_alive = np.zeros((n, max_bullets), np.bool_)
+        self.bullet_x = np.zeros((n, max_bullets))
+        self.bullet_y = np.zeros((n, max_bullets))
+
+        self.rows = np.arange(n)
+        self.spawns_dropped = 0
+        self.rng = np.random.default_rng(seed)
+        self._reset_games(np.ones(n, np.bool_))
+
+    def reset(self, seed=None):
+        """Start every game over, returns (observations, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.spawns_dropped = 0
+        self._reset_games(np.ones(self.num_envs, np.bool_))
+        return self.observe(), {}
+
+    def _reset_games(self, games):
+        """Put the games where games is True back to the start of a round"""
+        self.player_x[games] = PLAYER_X
+        self.player_y[games] = PLAYER_INITIAL_Y
+        self.change_x[games] = 0
+        self.change_y[games] = 0
+        self.jump_state[games] = NOT_JUMPING
+        self.original_y[games] = PLAYER_INITIAL_Y
+        self.powering[games] = False
+        self.hold_timer[games] = np.inf
+        self.wipe_timer[games] = np.inf
+        self.bullet_cooldown[games] = 0
+        self.power_cooldown[games] = 0
+        self.health[games] = PLAYER_MAX_HEALTH
+        self.score[games] = 0
+        self.steps[games] = 0
+        self.wave_time[games] = 0
+        self.cycle_start[games] = 0
+        self.cursor[games] = 0
+        self.enemy_alive[games] = False
+        self.bullet_alive[games] = False
+
+    def step(self, actions):
+        """
+        Play one frame (frame_skip fixed steps) of every game. actions is (num_envs, 4) ints, see ACTION_*.
+        Returns (observations, rewards, terminated, truncated, info) like a Gym vector env. Games that
+        finish are started over straight away, when any did info["final_observation"] is an object array
+        with each finished game's last observation (None for the rest) and info["_final_observation"]
+        the mask of which ones finished
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs, len(ACTION_SIZES)):
+            raise ValueError(f"actions should have shape {(self.num_envs, len(ACTION_SIZES))}, not {actions.shape}")
+        if not np.issubdtype(actions.dtype, np.integer):
+            raise ValueError(f"actions should be integers, not {actions.dtype}")
+        # Out of range values would index past the speed tables (or wrap round from the end if negative)
+        bad = (actions < 0) | (actions >= np.array(ACTION_SIZES))
+        if bad.any():
+            games, columns = np.nonzero(bad)
+            values = ", ".join(f"game {game} column {column} = {actions[game, column]}"
+                               for game, column in zip(games[:5], columns[:5]))
+            raise ValueError(f"actions out of range for ACTION_SIZES {ACTION_SIZES}: {values}")
+        score = self.score.copy()
+        health = self.health.copy()
+
+        # Held controls, pressing up/down only does something when the player isn't mid powerup jump
+        self.change_x = HORIZONTAL_SPEEDS[actions[:, ACTION_HORIZONTAL]]
+        self.change_y = VERTICAL_SPEEDS[actions[:, ACTION_VERTICAL]]
+        # Presses only go in on the first fixed step, like a key press landing on one step
+        shoot = actions[:, ACTION_SHOOT] == 1
+        power = actions[:, ACTION_POWER] == 1
+        for i in range(self.frame_skip):
+            self._step(FIXED_TIMESTEP, shoot, power)
+            if i == 0:
+                shoot = power = None
+        self.steps += 1
+
+        rewards = (self.score - score) / POINTS_PER_KILL - self.heart_penalty * (health - self.health)
+        terminated = self.health <= 0
+        truncated = ~terminated & (self.steps >= self.max_episode_steps)
+        done = terminated | truncated
+        info = {
+            "score": self.score.copy(),
+            "episode_length": self.steps.copy(),
+            "spawns_dropped": self.spawns_dropped,
+        }
+        if done.any():
+            obs = self.observe()
+            final = np.empty(self.num_envs, object)
+            for game in np.flatnonzero(done):
+                final[game] = obs[game]
+            info["final_observation"] = final
+            info["_final_observation"] = done
+            self._reset_games(done)
+        return self.observe(), rewards.astype(np.float32), terminated, truncated, info
+
+    def _step(self, delta_time, shoot=None, power=None):
+        """One fixed step of every game, the phases in the same order as GameSimulation.step"""
+        frames = delta_time * BASE_FRAME_RATE
+        live = self.health > 0
+        if shoot is not None:
+            self._inputs(live, shoot, power)
+
+        # Timers
+        self.bullet_cooldown -= delta_time
+        self.power_cooldown -= delta_time
+        self.hold_timer -= delta_time
+        self.wipe_timer -= delta_time
+        held = self.hold_timer <= 0
+        self.jump_state[held] = RETURNING_TO_ORIGINAL
+        self.hold_timer[held] = np.inf
+        wipe = live & (self.wipe_timer <= 0)
+        if wipe.any():
+            self.score[wipe] += POINTS_PER_KILL * self.enemy_alive[wipe].sum(axis=1)
+            self.enemy_alive[wipe] = False
+            self.wipe_timer[wipe] = np.inf
+        # Drones reaching the right edge cost a heart each, bullets past the left edge go
+        alive = self.enemy_alive
+        breached = alive & (self.enemy_x + self.enemy_box[2] >= SCREEN_WIDTH) & live[:, None]
+        if breached.any():
+            self.health -= breached.sum(axis=1)
+            alive &= ~breached
+        self.bullet_alive &= self.bullet_x + self.bullet_width > 0
+
+        self._spawn(delta_time, live)
+
+        # Move bullets and drones
+        self.bullet_x -= Bullet_speed * frames
+        self.enemy_x += self.enemy_vx * frames
+
+        # Bullet collisions, one bullet slot at a time across every game, each hits the first drone it touches
+        lefts, bottoms, rights, tops = self._enemy_bounds()
+        box_left, box_bottom, box_right, box_top = self.bullet_box
+        for slot in range(self.bullet_alive.shape[1]):
+            flying = self.bullet_alive[:, slot] & live
+            if not flying.any():
+                continue
+            x = self.bullet_x[:, slot, None]
+            y = self.bullet_y[:, slot, None]
+            hits = (alive & flying[:, None] & (lefts <= x + box_right) & (rights >= x + box_left)
+                    & (bottoms <= y + box_top) & (tops >= y + box_bottom))
+            games = np.flatnonzero(hits.any(axis=1))
+            if not len(games):
+                continue
+            drones = hits[games].argmax(axis=1)
+            self.bullet_alive[games, slot] = False
+            self.enemy_health[games, drones] -= 1
+            killed = self.enemy_health[games, drones] <= 0
+            alive[games[killed], drones[killed]] = False
+            self.score[games[killed]] += POINTS_PER_KILL
+
+        # Player collisions, every drone touching the player costs a heart (not while powering)
+        box_left, box_bottom, box_right, box_top = self.player_box
+        x = self.player_x[:, None]
+        y = self.player_y[:, None]
+        hits = (alive & (live & ~self.powering)[:, None] & (lefts <= x + box_right) & (rights >= x + box_left)
+                & (bottoms <= y + box_top) & (tops >= y + box_bottom))
+        if hits.any():
+            alive &= ~hits
+            self.health -= hits.sum(axis=1)
+
+        self._move_player(frames)
+
+    def _inputs(self, live, shoot, power):
+        """SPACE and E presses, with the same cooldown and powerup rules as GameSimulation.press"""
+        shoot = shoot & live & (self.bullet_cooldown <= 0) & ~self.powering
+        games = np.flatnonzero(shoot)
+        if len(games):
+            free = ~self.bullet_alive[games]
+            slots = free.argmax(axis=1)
+            fits = free[np.arange(len(games)), slots]
+            games = games[fits]
+            slots = slots[fits]
+            self.bullet_alive[games, slots] = True
+            self.bullet_x[games, slots] = self.player_x[games]
+            self.bullet_y[games, slots] = self.player_y[games]
+            self.bullet_cooldown[shoot] = self.bullet_cooldown_time
+
+        power = power & live & (self.power_cooldown <= 0)
+        start = power & ~self.powering
+        self.powering[start] = True
+        self.jump_state[start] = MOVING_TO_POSITION
+        self.original_y[start] = self.player_y[start]
+        self.wipe_timer[start] = self.powerup_destruction_time
+        self.power_cooldown[power] = self.power_cooldown_time
+
+    def _enemy_bounds(self):
+        """(lefts, bottoms, rights, tops) of every drone slot"""
+        x = self.enemy_x
+        y = self.enemy_y
+        box_left, box_bottom, box_right, box_top = self.enemy_box
+        return x + box_left, y + box_bottom, x + box_right, y + box_top
+
+    def _spawn(self, delta_time, live):
+        """Spawn whatever each game's wave clock has due, at most the plan's spawn budget per game"""
+        table = self.spawns
+        self.wave_time[live] += delta_time
+        for _ in range(table.budget):
+            due = live & (self.cycle_start + table.times[self.cursor] <= self.wave_time)
+            games = np.flatnonzero(due)
+            if not len(games):
+                break
+            entries = self.cursor[games]
+            rolls = self.rng.random((2, len(games)))
+            lanes = table.lanes[entries, (rolls[0] * table.lane_counts[entries]).astype(np.int64)]
+            types = table.types[entries, (rolls[1] * table.type_counts[entries]).astype(np.int64)]
+
+            free = ~self.enemy_alive[games]
+            slots = free.argmax(axis=1)
+            fits = free[np.arange(len(games)), slots]
+            self.spawns_dropped += len(games) - int(fits.sum())
+            at, slots = games[fits], slots[fits]
+            self.enemy_alive[at, slots] = True
+            self.enemy_x[at, slots] = -30
+            self.enemy_y[at, slots] = lanes[fits]
+            self.enemy_type[at, slots] = types[fits]
+            self.enemy_box[:, at, slots] = self.drone_boxes[types[fits]].T
+            self.enemy_vx[at, slots] = table.speeds[entries[fits]]
+            self.enemy_health[at, slots] = ENEMY_HEALTH
+
+            # Dropped spawns still use up their place in the timeline
+            self.cursor[games] += 1
+            if table.loop:
+                wrapped = games[self.cursor[games] == table.length]
+                self.cursor[wrapped] = 0
+                self.cycle_start[wrapped] += table.duration
+
+    def _move_player(self, frames):
+        """Player.update over every game: the powerup jump, held movement and staying on screen"""
+        state = self.jump_state
+        moving = state == MOVING_TO_POSITION
+        returning = (state == RETURNING_TO_ORIGINAL) & (self.player_y > self.original_y)
+        y = self.player_y
+
+        y[moving] += JUMPING_SPEED * frames
+        top = moving & (y >= self.y_max)
+        y[top] = self.y_max
+        state[top] = HOLDING_AT_POSITION
+        self.hold_timer[top] = HOLD_AT_POSITION_DURATION
+
+        y[returning] -= JUMPING_SPEED * frames
+        landed = returning & (y <= self.original_y)
+        y[landed] = self.original_y[landed]
+        state[landed] = NOT_JUMPING
+        self.powering[landed] = False
+
+        walking = state == NOT_JUMPING
+        y += np.where(walking, self.change_y * frames, 0)
+        np.copyto(y, np.clip(y, self.y_min, self.y_max), where=walking)
+        self.player_x += self.change_x * frames
+        np.clip(self.player_x, self.x_min, self.x_max, out=self.player_x)
+
+    def observe(self):
+        """(num_envs, OBSERVATION_SIZE) float32 observations, everything scaled to roughly 0 to 1"""
+        obs = np.zeros((self.num_envs, OBSERVATION_SIZE), np.float32)
+        obs[:, 0] = self.player_x / SCREEN_WIDTH
+        obs[:, 1] = self.player_y / SCREEN_HEIGHT
+        obs[:, 2] = np.maximum(self.bullet_cooldown, 0) / self.bullet_cooldown_time
+        obs[:, 3] = np.maximum(self.power_cooldown, 0) / self.power_cooldown_time
+        obs[:, 4] = self.powering
+        obs[:, 5] = self.health / PLAYER_MAX_HEALTH
+
+        # The drones closest to the right edge are the ones about to cost a heart
+        k = min(OBSERVED_ENEMIES, self.enemy_alive.shape[1])
+        closest = np.argsort(np.where(self.enemy_alive, -self.enemy_x, np.inf), axis=1)[:, :k]
+        present = np.take_along_axis(self.enemy_alive, closest, axis=1)
+        obs[:, 6:6 + 3 * k:3] = np.where(present, np.take_along_axis(self.enemy_x, closest, axis=1), 0) / SCREEN_WIDTH
+        obs[:, 7:7 + 3 * k:3] = np.where(present, np.take_along_axis(self.enemy_y, closest, axis=1), 0) / SCREEN_HEIGHT
+        obs[:, 8:8 + 3 * k:3] = present
+        return obs
+
+    def sample_actions(self):
+        """Random actions for every game, handy as a baseline"""
+        return self.rng.integers(0, ACTION_SIZES, (self.num_envs, len(ACTION_SIZES)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time stepping a batch of headless ROBOT UPRISING games")
+    parser.add_argument("--envs", type=int, default=256, help="games stepped together")
+    parser.add_argument("--steps", type=int, default=1000, help="env steps to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VectorGame(args.envs, seed=args.seed)
+    env.reset()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, terminated, truncated, _ = env.step(env.sample_actions())
+        episodes += int((terminated | truncated).sum())
+    elapsed = time.perf_counter() - start
+    print(f"{args.envs} envs x {args.steps} steps in {elapsed:.2f} s: {elapsed / args.steps * 1000:.3f} ms per step, "
+          f"{args.envs * args.steps / elapsed:,.0f} game frames/s, {episodes} episodes finished")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# ENEMY WAVES
+# Rounds of drones come from a wave file (waves.json) instead of one fixed random spawn interval.
+# Each wave says how many drones, which lanes and drone types, and how they're spaced out, and the
+# whole list gets compiled into a timeline of spawns up front. Only spawn_budget drones come out per
+# simulation step, so a 300 drone burst trickles in over a few frames instead of landing in one
+import json
+
+# Default wave file, and how many drones may spawn in a single step when the file doesn't say
+WAVES_PATH = "waves.json"
+SPAWN_BUDGET = 8
+
+# Enemy drone sprite sheets are Enemy_Drone_{n}.png for n from 1 to this, waves can only ask for those
+DRONE_TYPES = 5
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+#One wave of drones
+class Wave:
+    """count drones, interval seconds apart, starting delay seconds after the previous wave finishes"""
+
+    def __init__(self, name="wave", count=1, delay=0.0, interval=0.0, lanes=None, drone_types=None, speed=1):
+        """
+        lanes/drone_types are lists to pick from at random (None means any), interval 0 sends the
+        whole wave at once (still spread out by the spawn budget). speed has to be above 0, a drone that
+        never reaches the right edge would never leave the game
+        """
+        if not _is_number(speed) or speed <= 0:
+            raise ValueError("speed must be a number above 0")
+        self.name = name
+        self.count = count
+        self.delay = delay
+        self.interval = interval
+        self.lanes = lanes
+        self.drone_types = drone_types
+        self.speed = speed
+
+    @property
+    def duration(self):
+        """Seconds from this wave's delay running out to its last drone"""
+        return self.interval * max(self.count - 1, 0)
+
+
+#A list of waves plus how to play them
+class WavePlan:
+    """The waves in order, whether they loop once they run out, and the per-step spawn budget"""
+
+    def __init__(self, waves, loop=False, spawn_budget=SPAWN_BUDGET):
+        self.waves = list(waves)
+        self.loop = loop
+        self.spawn_budget = spawn_budget
+        self.duration = sum(wave.delay + wave.duration for wave in self.waves)
+        if spawn_budget < 1:
+            raise ValueError("spawn_budget must be at least 1")
+        if loop and self.waves and self.duration <= 0:
+            raise ValueError("a looping wave plan has to take some time, give a wave a delay or interval")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a plan from the parsed contents of a wave file"""
+        waves = []
+        for index, entry in enumerate(data.get("waves", [])):
+            try:
+                wave = Wave(**entry)
+            except TypeError as error:
+                raise ValueError(f"wave {index}: {error}") from None
+            except ValueError as error:
+                raise ValueError(f"wave {index} ({entry.get('name', 'wave')}): {error}") from None
+            if not isinstance(wave.count, int) or isinstance(wave.count, bool):
+                raise ValueError(f"wave {index} ({wave.name}): count must be a whole number")
+            if wave.count < 0:
+                raise ValueError(f"wave {index} ({wave.name}): count can't be negative")
+            if not all(_is_number(value) and value >= 0 for value in (wave.delay, wave.interval)):
+                raise ValueError(f"wave {index} ({wave.name}): delay and interval must be numbers, 0 or more")
+            if wave.lanes is not None and (
+                    not isinstance(wave.lanes, list) or not wave.lanes or not all(map(_is_number, wave.lanes))):
+                raise ValueError(f"wave {index} ({wave.name}): lanes must be a non-empty list of numbers")
+            if wave.drone_types is not None and (
+                    not isinstance(wave.drone_types, list) or not wave.drone_types
+                    or not all(isinstance(number, int) and not isinstance(number, bool)
+                               and 1 <= number <= DRONE_TYPES for number in wave.drone_types)):
+                raise ValueError(f"wave {index} ({wave.name}): drone_types must be a non-empty list "
+                                 f"of drone numbers from 1 to {DRONE_TYPES}")
+            waves.append(wave)
+        return cls(waves, data.get("loop", False), data.get("spawn_budget", SPAWN_BUDGET))
+
+    @classmethod
+    def load(cls, path=WAVES_PATH):
+        """Read a wave file"""
+        with open(path) as f:
+            data = json.load(f)
+        try:
+            return cls.from_dict(data)
+        except ValueError as error:
+            raise ValueError(f"{path}: {error}") from None
+
+    def compile(self, rng, lanes, drone_types):
+        """
+        Turn the plan into a timeline of (time, y, drone_number, speed) sorted by time,
+        lanes/drone_types are the choices for waves that don't list their own
+        """
+        timeline = []
+        time = 0.0
+        for wave in self.waves:
+            time += wave.delay
+            wave_lanes = wave.lanes or lanes
+            wave_types = wave.drone_types or drone_types
+            for i in range(wave.count):
+                timeline.append((time + i * wave.interval, rng.choice(wave_lanes), rng.choice(wave_types), wave.speed))
+            time += wave.duration
+        return timeline
+
+
+#Plays a plan back
+class WaveScheduler:
+    """Hands out the spawns that are due each step, at most the plan's spawn_budget at a time"""
+
+    def __init__(self, plan, rng, lanes, drone_types):
+        """rng picks the lanes and drone types, one fresh timeline is compiled per loop of the plan"""
+        self.plan = plan
+        self.rng = rng
+        self.lanes = lanes
+        self.drone_types = drone_types
+        self.time = 0.0
+        self.cycle_start = 0.0
+        self.timeline = plan.compile(rng, lanes, drone_types)
+        self.cursor = 0
+
+    def update(self, delta_time):
+        """Move the clock on and return the spawns to make this step, overdue ones wait for the next step"""
+        self.time += delta_time
+        due = []
+        budget = self.plan.spawn_budget
+        while len(due) < budget:
+            if self.cursor == len(self.timeline):
+                if not (self.plan.loop and self.timeline):
+                    break
+                # Start the next loop of the plan with freshly rolled lanes and types
+                self.cycle_start += self.plan.duration
+                self.timeline = self.plan.compile(self.rng, self.lanes, self.drone_types)
+                self.cursor = 0
+            at, y, drone_number, speed = self.timeline[self.cursor]
+            if self.cycle_start + at > self.time:
+                break
+            due.append((y, drone_number, speed))
+            self.cursor += 1
+        return due
+
+    def backlog(self):
+        """How many spawns are overdue and waiting on the budget"""
+        waiting = 0
+        for at, _, _, _ in self.timeline[self.cursor:]:
+            if self.cycle_start + at > self.time:
+                break
+            waiting += 1
+        return waiting